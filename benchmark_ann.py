@@ -0,0 +1,118 @@
+"""
+Recall@K vs. latency report for the approximate (IVF) content index.
+
+Ground truth is exact cosine top-K over the full catalog for a sample of
+query products. With many identical feature vectors a neighbor counts as
+correct when its score reaches the exact K-th best score, so ties do not
+count as misses.
+
+For every probe count it reports single-query latency and recall of
+IVFIndex.search; for the default probe count it also times the full (N, K)
+index build against an estimate of the exact blocked build.
+
+Usage:
+    python benchmark_ann.py [--sizes 100000 1000000] [--k 50] [--queries 500]
+                            [--probes 1 2 4 8 16]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.ann_index import IVFIndex, DEFAULT_PROBES
+from src.neighbor_index import normalize_rows, select_topk, DEFAULT_BLOCK_SIZE
+from src.recommender import build_feature_matrix
+from src.synthetic_data import generate_products
+
+
+def product_features(n_products, seed=0):
+    """Unit feature vectors (price, rating, category) of a synthetic catalog."""
+    products = generate_products(n_products, seed=seed)
+    rng = np.random.default_rng(seed)
+    catalog = pd.DataFrame({
+        'Product': products['Product'],
+        'Category': products['Category'],
+        'Sales': products['Unit Price'],
+        'Rating': np.clip(products['Base Rating'] + rng.normal(0, 0.5, n_products), 1, 5),
+    })
+    features, _ = build_feature_matrix(catalog)
+    return normalize_rows(features)
+
+
+def exact_topk(unit, rows, k):
+    block = unit[rows] @ unit.T
+    block[np.arange(len(rows)), rows] = -np.inf
+    return select_topk(block, k)
+
+
+def recall(scores, exact_scores):
+    """Share of returned neighbors scoring at least the exact K-th best score."""
+    return float(np.mean(scores >= exact_scores[:, -1:] - 1e-6))
+
+
+def percentiles_ms(samples):
+    samples = np.asarray(samples) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def run_size(n_products, k, n_queries, probe_counts):
+    unit = product_features(n_products)
+    rng = np.random.default_rng(1)
+    queries = rng.choice(n_products, min(n_queries, n_products), replace=False)
+
+    exact_latency = []
+    exact_scores = []
+    for row in queries:
+        start = time.perf_counter()
+        _, scores = exact_topk(unit, np.array([row]), k)
+        exact_latency.append(time.perf_counter() - start)
+        exact_scores.append(scores[0])
+    exact_scores = np.array(exact_scores)
+    p50, p99 = percentiles_ms(exact_latency)
+
+    start = time.perf_counter()
+    index = IVFIndex.build(unit)
+    cluster_seconds = time.perf_counter() - start
+    print(f"\n{n_products} products, K={k}, {index.n_lists} clusters (k-means {cluster_seconds:.2f}s)")
+    print(f"{'method':<16}{'recall@K':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    print('-' * 46)
+    print(f"{'exact':<16}{1.0:>10.4f}{p50:>10.3f}{p99:>10.3f}")
+    for n_probe in probe_counts:
+        latency = []
+        scores = []
+        for row in queries:
+            start = time.perf_counter()
+            _, row_scores = index.search(unit, row, k, n_probe=n_probe)
+            latency.append(time.perf_counter() - start)
+            scores.append(row_scores)
+        p50, p99 = percentiles_ms(latency)
+        print(f"{f'ivf probes={n_probe}':<16}{recall(np.array(scores), exact_scores):>10.4f}{p50:>10.3f}{p99:>10.3f}")
+
+    # Full index build: ANN for every row vs. the exact build extrapolated from a few blocks
+    start = time.perf_counter()
+    _, ann_scores = index.build_topk(unit, k=k, n_probe=DEFAULT_PROBES)
+    ann_build = cluster_seconds + time.perf_counter() - start
+    sample_rows = np.arange(min(n_products, 2048))
+    start = time.perf_counter()
+    for block in np.array_split(sample_rows, max(1, len(sample_rows) // DEFAULT_BLOCK_SIZE)):
+        exact_topk(unit, block, k)
+    exact_build = (time.perf_counter() - start) * n_products / len(sample_rows)
+    print(f"Full index build: exact ~{exact_build:.1f}s (extrapolated), "
+          f"IVF probes={DEFAULT_PROBES} {ann_build:.1f}s, recall@K {recall(ann_scores[queries], exact_scores):.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--probes', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    for n_products in args.sizes:
+        run_size(n_products, args.k, args.queries, args.probes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Concurrency stress test for one ProductRecommender shared by many threads
+(as the dashboard's @st.cache_resource instance is shared by all sessions).
+
+Reader threads request recommendations while writer threads add ratings with
+a small flush size and rebuild threshold, so the index is patched and fully
+rebuilt many times during the run. Every reader checks the model it read:
+- neighbor lists point inside the table, never list the product itself and
+  are sorted by score
+- every listed score equals the cosine of the two products' feature rows in
+  that same model (a half-patched or half-built model fails this)
+- model versions never go backwards
+
+It reports violations, read and add_rating latency next to the time of one
+full rebuild, and the number of published models. With --background the
+updates run on the recommender's background worker instead of in whichever
+request finds them pending. Exits with status 1 on any violation.
+
+Usage:
+    python benchmark_concurrency.py [--products 5000] [--readers 8] [--writers 2]
+                                    [--seconds 10] [--background]
+"""
+import argparse
+import contextlib
+import io
+import sys
+import threading
+import time
+
+import numpy as np
+
+from src.recommender import ProductRecommender
+from benchmark_similarity import synthetic_catalog
+
+
+def check_model(model, rows):
+    """Problems found in the neighbor lists of `rows` (empty if the model is consistent)."""
+    problems = []
+    indices = model.neighbor_indices[rows]
+    scores = model.neighbor_scores[rows]
+    if (indices < 0).any() or (indices >= len(model.data)).any():
+        problems.append('neighbor outside the table')
+        return problems
+    if (indices == rows[:, np.newaxis]).any():
+        problems.append('product listed as its own neighbor')
+    if (np.diff(scores, axis=1) > 1e-6).any():
+        problems.append('neighbor list not sorted')
+    expected = np.einsum('ij,ikj->ik', model.unit_features[rows], model.unit_features[indices])
+    if np.abs(expected - scores).max() > 1e-4:
+        problems.append('scores do not match the model features')
+    return problems
+
+
+def reader(recommender, names, stop, results, seed):
+    rng = np.random.default_rng(seed)
+    latency, problems, last_version = [], [], -1
+    while not stop.is_set():
+        model = recommender.model
+        if model.version < last_version:
+            problems.append('model version went backwards')
+        last_version = model.version
+        problems.extend(check_model(model, rng.integers(0, len(model.data), 8)))
+
+        name = names[rng.integers(len(names))]
+        start = time.perf_counter()
+        if rng.random() < 0.5:
+            recs = recommender.get_recommendations(name, n=10)
+        else:
+            recs = recommender.get_recommendations_batch([name, names[rng.integers(len(names))]], n=10, merge='max')
+        latency.append(time.perf_counter() - start)
+        if len(recs) != 10:
+            problems.append(f'expected 10 recommendations, got {len(recs)}')
+    results.append((latency, problems))
+
+
+def writer(recommender, product_ids, stop, write_latency, seed):
+    rng = np.random.default_rng(seed)
+    latency = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        recommender.add_rating(f"stress-{seed}-{rng.integers(1000)}", product_ids[rng.integers(len(product_ids))],
+                               int(rng.integers(1, 6)))
+        latency.append(time.perf_counter() - start)
+    write_latency.append(latency)
+
+
+def latency_summary(samples):
+    samples = np.concatenate([np.asarray(s) for s in samples]) * 1000
+    return (f"{len(samples)} (p50 {np.percentile(samples, 50):.2f} ms, p99 {np.percentile(samples, 99):.2f} ms, "
+            f"max {samples.max():.2f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--background', action='store_true', help="apply updates on the background worker")
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.products)
+    with contextlib.redirect_stdout(io.StringIO()):
+        recommender = ProductRecommender(data=catalog, aggregate=False, use_snapshot=False, import_ratings=False,
+                                         flush_size=8, rebuild_threshold=200,
+                                         background_rebuild=args.background, rebuild_debounce=0.05)
+    start = time.perf_counter()
+    recommender._update_similarity_matrix()
+    rebuild_s = time.perf_counter() - start
+    first_version = recommender.model.version
+
+    stop = threading.Event()
+    results, write_latency = [], []
+    names = catalog['Product'].tolist()
+    product_ids = catalog['Product ID'].tolist()
+    threads = [threading.Thread(target=reader, args=(recommender, names, stop, results, i))
+               for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(recommender, product_ids, stop, write_latency, 1000 + i))
+                for i in range(args.writers)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        recommender.close()
+    problems = [problem for _, found in results for problem in found]
+    mode = 'background worker' if args.background else 'updates on the request path'
+    print(f"{args.products} products, {args.readers} readers, {args.writers} writers, {args.seconds:.0f}s, {mode}")
+    print(f"Models published:  {recommender.model.version - first_version}")
+    print(f"Full rebuild:      {rebuild_s * 1000:.1f} ms")
+    print(f"Reads:             {latency_summary([samples for samples, _ in results])}")
+    print(f"Ratings added:     {latency_summary(write_latency)}")
+    if problems:
+        unique, counts = np.unique(problems, return_counts=True)
+        print("Violations:")
+        for problem, count in zip(unique, counts):
+            print(f"  {count} x {problem}")
+        sys.exit(1)
+    print("Violations:        none")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Rerun cost of the dashboard's "All Products" grid, unpaginated vs paginated,
+with one Streamlit element per card field vs one HTML block per grid.
+
+Streamlit is not needed: every st.columns / st.markdown / st.image call the
+grid makes is recorded as one element with the text it would send, so the
+run times the data access and string building a rerun does, and counts the
+elements and payload bytes sent to the browser.
+
+Renderers:
+- elements: a card as columns, st.image and five st.markdown calls (the
+  previous grid)
+- one block: the whole grid as one HTML block from src/cards.py
+
+Grids:
+- all products: every product of the selection (the grid before pagination)
+- paged: one page of products, as the grid renders by default
+- infinite scroll: after loading `--scroll-pages` pages
+
+Usage:
+    python benchmark_grid.py [--products 10000] [--page-size 24] [--scroll-pages 5]
+                             [--runs 5]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.cards import product_cards
+from src.facet_index import FacetIndex
+from src.pagination import page_bounds
+from benchmark_similarity import synthetic_catalog
+
+PRODUCTS_PER_ROW = 3
+
+
+def render_elements(page_data, elements):
+    """Record the elements the grid emits for `page_data` (same calls as the dashboard)."""
+    num_rows = (len(page_data) + PRODUCTS_PER_ROW - 1) // PRODUCTS_PER_ROW
+    for row in range(num_rows):
+        elements.append('columns')
+        for col in range(PRODUCTS_PER_ROW):
+            idx = row * PRODUCTS_PER_ROW + col
+            if idx < len(page_data):
+                product = page_data.iloc[idx]
+                elements.append('<div style="background-color: white; border-radius: 18px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); padding: 15px; height: 100%">')
+                if pd.notna(product['Product Image URL']):
+                    elements.append(f"image {product['Product Image URL']} 130")
+                else:
+                    elements.append("image https://via.placeholder.com/140x140?text=No+Image 130")
+                elements.append(f"**{product['Product']}**")
+                elements.append(f"<span style='color: #B12704; font-weight: bold; font-size: 18px;'>${product['Sales']:.2f}</span>")
+                elements.append(f"<span style='color: #565959; font-size: 14px;'>{product['Category']} | {product['Country']}</span>")
+                rating = int(product["Rating"])
+                elements.append(f"<span style='color: #FFA41C;'>{'★' * rating}{'☆' * (5-rating)}</span>")
+                elements.append('</div>')
+            elements.append('</div>')
+    elements.append('</div>')
+
+
+def render_block(page_data, elements):
+    """Record the single element the grid emits with src/cards.py."""
+    elements.append(product_cards(page_data, columns=PRODUCTS_PER_ROW))
+
+
+RENDERERS = {'elements': render_elements, 'one block': render_block}
+
+
+def rerun(data, positions, bounds, render):
+    """One rerun of the grid; returns (seconds, elements, payload bytes)."""
+    elements = []
+    start = time.perf_counter()
+    page_data = data.take(positions if bounds is None else positions[bounds[0]:bounds[1]])
+    render(page_data, elements)
+    seconds = time.perf_counter() - start
+    return seconds, len(elements), sum(len(element.encode()) for element in elements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=24)
+    parser.add_argument('--scroll-pages', type=int, default=5)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    data = synthetic_catalog(args.products)
+    data['Product Image URL'] = [f"https://example.com/images/{i}.jpg?sw=1080" for i in range(args.products)]
+    positions, _ = FacetIndex(data).select('All', 'All', 0.0, "Rating (High to Low)")
+
+    cases = {
+        'all products': None,
+        'paged': page_bounds(len(positions), args.page_size, 0),
+        'infinite scroll': page_bounds(len(positions), args.page_size, args.scroll_pages - 1, infinite=True),
+    }
+    print(f"{args.products} products, page size {args.page_size}, median of {args.runs} reruns")
+    print(f"{'grid':>16}{'renderer':>11}{'cards':>8}{'rerun (ms)':>12}{'elements':>10}{'payload (KB)':>14}")
+    print('-' * 71)
+    for name, bounds in cases.items():
+        cards = len(positions) if bounds is None else bounds[1] - bounds[0]
+        for renderer, render in RENDERERS.items():
+            results = [rerun(data, positions, bounds, render) for _ in range(args.runs)]
+            seconds = np.median([r[0] for r in results])
+            _, n_elements, payload = results[0]
+            print(f"{name:>16}{renderer:>11}{cards:>8}{seconds * 1000:>12.1f}{n_elements:>10}{payload / 1024:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Latency micro-benchmark for ProductRecommender.get_recommendations.
+
+Compares the old selection (Python sort over a full similarity row, then one
+`iloc` per result) against the neighbor-index lookup and the argpartition
+path used when more than K results are requested.
+
+Usage:
+    python benchmark_latency.py [--sizes 1000 10000 100000] [--queries 200]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from src.recommender import ProductRecommender
+from benchmark_similarity import synthetic_catalog
+
+
+def legacy_recommendations(recommender, product_name, row_scores, n):
+    """The original lookup and selection code, fed with a precomputed similarity row."""
+    data = recommender.data
+    if product_name not in data['Product'].values:
+        return []
+    data[data['Product'] == product_name].index[0]
+    sim_scores = list(enumerate(row_scores))
+    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
+    sim_scores = sim_scores[1:n + 1]
+    recommendations = []
+    for idx, score in sim_scores:
+        product = recommender.data.iloc[idx]
+        recommendations.append({
+            'name': product['Product'],
+            'category': product.get('Category', 'Unknown'),
+            'price': product.get('Sales', 0),
+            'similarity': score,
+            'image_url': product.get('Product Image URL', ''),
+            'rating': product.get('Rating', 0)
+        })
+    return recommendations
+
+
+def percentiles_ms(samples):
+    samples = np.asarray(samples) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def time_calls(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return percentiles_ms(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--n', type=int, default=5, help="Recommendations per query")
+    parser.add_argument('--k', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'products':>10}{'path':>14}{'p50 ms':>10}{'p95 ms':>10}")
+    print('-' * 44)
+    for n_products in args.sizes:
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommender = ProductRecommender(data=synthetic_catalog(n_products), top_k=args.k)
+        rng = np.random.default_rng(0)
+        rows = rng.integers(0, n_products, args.queries)
+        names = recommender.data['Product'].to_numpy()[rows]
+
+        # Similarity rows are precomputed, as the old dense matrix already held them
+        unit = recommender._unit_features
+        legacy = time_calls(legacy_recommendations,
+                            [(recommender, name, unit @ unit[row], args.n)
+                             for name, row in zip(names[:50], rows[:50])])
+        indexed = time_calls(recommender.get_recommendations, [(name, args.n) for name in names])
+        wide = time_calls(recommender.get_recommendations, [(name, args.k * 2) for name in names])
+
+        for path, (p50, p95) in [('legacy sort', legacy), ('top-K index', indexed),
+                                 (f"argpart n={args.k * 2}", wide)]:
+            print(f"{n_products:>10}{path:>14}{p50:>10.3f}{p95:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark dataset load time: the old iterrows placeholder-image loop vs. the
+vectorized normalize_dataset stage, on synthetic CSV files.
+
+The legacy loop is only run up to --legacy-limit rows since it takes minutes
+on a 1M-row file. Also compares a ProductRecommender cold start that parses
+and builds everything with one served from the binary snapshot cache.
+
+Usage:
+    python benchmark_load.py [--sizes 10000 100000 1000000] [--legacy-limit 100000]
+                             [--cold-start-rows 20000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_prep import normalize_dataset
+from src.recommender import ProductRecommender
+from benchmark_similarity import synthetic_catalog
+
+
+def write_synthetic_csv(path, n_rows, missing_images=0.3, seed=0):
+    """Write a catalog CSV where a share of image URLs is missing or blank."""
+    df = synthetic_catalog(n_rows, seed=seed)
+    rng = np.random.default_rng(seed)
+    urls = np.where(rng.random(n_rows) < 0.5, "https://example.com/image.jpg", "")
+    missing = rng.random(n_rows) < missing_images
+    df['Product Image URL'] = np.where(missing, urls, "https://example.com/image.jpg")
+    df.loc[missing & (rng.random(n_rows) < 0.5), 'Product Image URL'] = None
+    df.to_csv(path, index=False)
+
+
+def legacy_fill(df):
+    """The original per-row placeholder fill from load_and_prepare_data."""
+    for index, row in df.iterrows():
+        if pd.isna(row['Product Image URL']) or not isinstance(row['Product Image URL'], str) or not row['Product Image URL'].strip():
+            category = row['Category']
+            if pd.isna(category):
+                category = 'Product'
+            category_str = str(category).replace(' ', '+')
+            df.at[index, 'Product Image URL'] = f"https://via.placeholder.com/140x140?text={category_str}"
+    return df
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def cold_start(path, use_snapshot):
+    """Seconds to construct a ProductRecommender from a CSV file."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ProductRecommender(path, use_snapshot=use_snapshot)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--legacy-limit', type=int, default=100000)
+    parser.add_argument('--cold-start-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'read_csv (s)':>14}{'legacy fill (s)':>17}{'vectorized (s)':>16}")
+    print('-' * 57)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.sizes:
+            path = os.path.join(tmp, f"synthetic_{n_rows}.csv")
+            write_synthetic_csv(path, n_rows)
+
+            start = time.perf_counter()
+            df = pd.read_csv(path, encoding='latin-1')
+            read_seconds = time.perf_counter() - start
+
+            if n_rows <= args.legacy_limit:
+                legacy = f"{timed(legacy_fill, df.copy()):.3f}"
+            else:
+                legacy = 'skipped'
+            vectorized = timed(normalize_dataset, df)
+            print(f"{n_rows:>10}{read_seconds:>14.3f}{legacy:>17}{vectorized:>16.3f}")
+
+        path = os.path.join(tmp, "cold_start.csv")
+        write_synthetic_csv(path, args.cold_start_rows)
+        no_snapshot = cold_start(path, use_snapshot=False)
+        cold_start(path, use_snapshot=True)  # Writes the snapshot
+        from_snapshot = cold_start(path, use_snapshot=True)
+        print(f"\nCold start with {args.cold_start_rows} rows: "
+              f"parse + build {no_snapshot:.3f}s, snapshot {from_snapshot:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
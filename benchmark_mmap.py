@@ -0,0 +1,94 @@
+"""
+Measure per-process memory when several processes (like Streamlit replicas)
+load the same recommender snapshot with private arrays vs. memory-mapped ones.
+
+RSS counts shared pages in every process, so on Linux we also report PSS
+(shared pages split between the processes using them) and private memory
+from /proc/self/smaps_rollup, which show the actual saving.
+
+Usage:
+    python benchmark_mmap.py [--products 50000] [--k 200] [--workers 4]
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+
+from src.recommender import ProductRecommender
+from benchmark_similarity import synthetic_catalog
+
+
+def memory_usage_mb():
+    """RSS, PSS and private memory of this process in MB (Linux only, else None)."""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = {line.split(':')[0]: int(line.split()[1]) for line in f if line.split()[-1] == 'kB'}
+    except OSError:
+        return None
+    private = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {'rss': fields['Rss'] / 1024, 'pss': fields['Pss'] / 1024, 'private': private / 1024}
+
+
+def _worker(path, k, mmap_mode, barrier, queue):
+    with contextlib.redirect_stdout(io.StringIO()):
+        recommender = ProductRecommender(path, top_k=k, mmap_mode=mmap_mode)
+    # Touch every page of the numeric arrays, as serving traffic eventually does
+    for array in (recommender._features, recommender._unit_features,
+                  recommender.neighbor_indices, recommender.neighbor_scores):
+        np.asarray(array).sum()
+    recommender.get_recommendations('Product 1', 5)
+    # Measure while every worker is alive so shared pages are split between them
+    barrier.wait()
+    queue.put(memory_usage_mb())
+    barrier.wait()
+
+
+def run_workers(path, k, mmap_mode, n_workers):
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(n_workers)
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(path, k, mmap_mode, barrier, queue)) for _ in range(n_workers)]
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=50000)
+    parser.add_argument('--k', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.csv")
+        synthetic_catalog(args.products).to_csv(path, index=False)
+        # Build the snapshot once so every worker starts from it
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommender = ProductRecommender(path, top_k=args.k)
+        array_mb = sum(np.asarray(a).nbytes for a in (recommender._features, recommender._unit_features,
+                                                      recommender.neighbor_indices,
+                                                      recommender.neighbor_scores)) / 1024 ** 2
+        del recommender
+        print(f"{args.products} products, K={args.k}: {array_mb:.1f} MB of numeric arrays per copy\n")
+
+        print(f"{'mode':<10}{'workers':>8}{'avg RSS MB':>12}{'avg PSS MB':>12}{'avg private MB':>16}")
+        print('-' * 58)
+        for label, mmap_mode in [('private', None), ('mmap r', 'r'), ('mmap c', 'c')]:
+            results = run_workers(path, args.k, mmap_mode, args.workers)
+            if results[0] is None:
+                print(f"{label:<10}{args.workers:>8}  (memory breakdown needs /proc/self/smaps_rollup)")
+                continue
+            avg = {key: np.mean([r[key] for r in results]) for key in results[0]}
+            print(f"{label:<10}{args.workers:>8}{avg['rss']:>12.1f}{avg['pss']:>12.1f}{avg['private']:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
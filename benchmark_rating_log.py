@@ -0,0 +1,96 @@
+"""
+Write throughput and replay time of the durable rating log.
+
+Appends are timed for several fsync batch sizes (sync_every=1 fsyncs every
+rating). Replay is timed for logs of millions of entries, both as a plain
+append-only log and after compaction into the columnar snapshot, and
+includes loading the replayed ratings into a RatingStore.
+
+Usage:
+    python benchmark_rating_log.py [--appends 20000] [--sync-every 1 64 1024]
+                                   [--sizes 1000000 5000000]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.rating_log import RatingLog, LOG_FILE
+from src.rating_store import RatingStore
+
+
+def synthetic_ratings(n_ratings, n_users=200000, n_products=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    products = rng.integers(0, n_products, n_ratings)
+    return pd.DataFrame({
+        'User ID': pd.Series(rng.integers(0, n_users, n_ratings)).map('U-{:07d}'.format),
+        'Product ID': pd.Series(products).map('P{:05d}'.format),
+        'Product': pd.Series(products).map('Product {}'.format),
+        'Rating': rng.integers(1, 6, n_ratings),
+        'Timestamp': 1.7e9 + np.arange(n_ratings, dtype=np.float64),
+    })
+
+
+def time_appends(n_appends, sync_every):
+    directory = tempfile.mkdtemp()
+    try:
+        ratings = synthetic_ratings(n_appends).itertuples(index=False)
+        log = RatingLog(directory, sync_every=sync_every)
+        start = time.perf_counter()
+        for user_id, product_id, product_name, rating, timestamp in ratings:
+            log.append(user_id, product_id, product_name, rating, timestamp)
+        log.close()
+        return time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory)
+
+
+def time_replay(log):
+    start = time.perf_counter()
+    ratings = log.replay()
+    replay_s = time.perf_counter() - start
+    start = time.perf_counter()
+    products = pd.MultiIndex.from_frame(ratings[['Product ID', 'Product']]).to_numpy()
+    RatingStore().bulk_import(ratings['User ID'].to_numpy(), products,
+                              ratings['Rating'].to_numpy(), ratings['Timestamp'].to_numpy())
+    return len(ratings), replay_s, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--appends', type=int, default=20000)
+    parser.add_argument('--sync-every', type=int, nargs='+', default=[1, 64, 1024])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000000, 5000000])
+    args = parser.parse_args()
+
+    print(f"{'sync_every':>10}{'appends':>10}{'seconds':>10}{'ratings/s':>12}")
+    print('-' * 42)
+    for sync_every in args.sync_every:
+        # One fsync per rating is slow; fewer appends keep the run short
+        n_appends = args.appends if sync_every > 1 else max(1, args.appends // 10)
+        seconds = time_appends(n_appends, sync_every)
+        print(f"{sync_every:>10}{n_appends:>10}{seconds:>10.2f}{n_appends / seconds:>12.0f}")
+
+    print(f"\n{'entries':>10}{'layout':>12}{'rows':>10}{'replay (s)':>12}{'store (s)':>11}")
+    print('-' * 55)
+    for n_ratings in args.sizes:
+        directory = tempfile.mkdtemp()
+        try:
+            # Write the log in one go; append() would dominate the run time
+            synthetic_ratings(n_ratings).to_csv(f"{directory}/{LOG_FILE}", header=False, index=False)
+            log = RatingLog(directory)
+            rows, replay_s, store_s = time_replay(log)
+            print(f"{n_ratings:>10}{'log':>12}{rows:>10}{replay_s:>12.2f}{store_s:>11.2f}")
+            log.compact()
+            rows, replay_s, store_s = time_replay(log)
+            print(f"{n_ratings:>10}{'compacted':>12}{rows:>10}{replay_s:>12.2f}{store_s:>11.2f}")
+            log.close()
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
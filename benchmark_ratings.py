@@ -0,0 +1,67 @@
+"""
+Benchmark rating write throughput: full neighbor-index rebuild per rating vs.
+the buffered incremental update path of ProductRecommender.add_rating.
+
+Usage:
+    python benchmark_ratings.py [--sizes 1000 10000 50000] [--ratings 2000]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from src.recommender import ProductRecommender
+from benchmark_similarity import synthetic_catalog
+
+
+def build_recommender(n_products, **kwargs):
+    # Silence the dataset summary printed while preparing the data
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ProductRecommender(data=synthetic_catalog(n_products), **kwargs)
+
+
+def bench_full_rebuild(recommender, repeats=3):
+    """Writes per second if every rating rebuilt the whole index (old behaviour)."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        recommender._update_similarity_matrix()
+    return repeats / (time.perf_counter() - start)
+
+
+def bench_incremental(recommender, n_ratings, seed=0):
+    """Writes per second through add_rating, including the final flush."""
+    rng = np.random.default_rng(seed)
+    n_products = len(recommender.data)
+    product_ids = [f"P{i}" for i in rng.integers(0, n_products, n_ratings)]
+    ratings = rng.integers(1, 6, n_ratings)
+
+    start = time.perf_counter()
+    for i, (product_id, rating) in enumerate(zip(product_ids, ratings)):
+        recommender.add_rating(f"user{i}", product_id, int(rating))
+    recommender._ensure_fresh()
+    return n_ratings / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--ratings', type=int, default=2000)
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--flush-size', type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'products':>10}{'rebuild/rating (w/s)':>24}{'incremental (w/s)':>20}{'speedup':>10}")
+    print('-' * 64)
+    for n_products in args.sizes:
+        # Keep the threshold out of reach so only the incremental path is measured
+        recommender = build_recommender(n_products, top_k=args.k, flush_size=args.flush_size,
+                                        rebuild_threshold=args.ratings + 1)
+        full = bench_full_rebuild(recommender)
+        incremental = bench_incremental(recommender, args.ratings)
+        print(f"{n_products:>10}{full:>24.1f}{incremental:>20.1f}{incremental / full:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+import time
+
 import pandas as pd
 
 # --- Load your Data ---
@@ -71,7 +73,8 @@ def recommend_v1_by_category(product_name, data_df, n=5):
     if len(similar_df) == 0:
         return pd.DataFrame()
     # Sort by rating to make sampling a bit more relevant if many options
-    return similar_df.sort_values(by='Rating', ascending=False).head(n)
+    # (stable, so ties keep dataset order and the output is deterministic)
+    return similar_df.sort_values(by='Rating', ascending=False, kind='stable').head(n)
 
 def recommend_v2_by_category_and_country(product_name, data_df, n=5):
     """Recommends N products from the same category AND country, excluding the product itself."""
@@ -92,7 +95,7 @@ def recommend_v2_by_category_and_country(product_name, data_df, n=5):
     
     if len(similar_df) == 0:
         return pd.DataFrame()
-    return similar_df.sort_values(by='Rating', ascending=False).head(n)
+    return similar_df.sort_values(by='Rating', ascending=False, kind='stable').head(n)
 
 def recommend_v3_by_global_popularity(data_df, n=5, exclude_product_name=None):
     """Recommends N globally most popular products based on Rating, excluding a specific product if provided."""
@@ -106,6 +109,86 @@ def recommend_v3_by_global_popularity(data_df, n=5, exclude_product_name=None):
     popular_df = popular_df.drop_duplicates(subset=['Product']).head(n)
     return popular_df
 
+# --- Grouped Recommendation Engine ---
+
+class GroupedRecommender:
+    """Precomputed rating-sorted index per Category and per (Category, Country).
+
+    Built with one sort and one groupby, so V1/V2 recommendations are a dict
+    lookup plus a slice instead of a full DataFrame scan and sort per product.
+    Produces exactly the same output as recommend_v1/v2 above.
+    """
+
+    def __init__(self, data_df):
+        self.data = data_df
+        # Category/Country of each product come from its first row, as in V1/V2
+        self.targets = data_df.drop_duplicates(subset=['Product'])[['Product', 'Category', 'Country']]
+        self._target_by_product = self.targets.set_index('Product')
+
+        # One stable sort by rating; groups keep that order internally
+        self.ordered = data_df.sort_values(by='Rating', ascending=False, kind='stable')
+        self._names = self.ordered['Product'].to_numpy()
+        self.by_category = self.ordered.groupby('Category', sort=False).indices
+        self.by_category_country = self.ordered.groupby(['Category', 'Country'], sort=False).indices
+
+    def recommend(self, product_name, n=5, by_country=False):
+        """Same result as recommend_v1 (or recommend_v2 with by_country=True)."""
+        if product_name not in self._target_by_product.index:
+            return pd.DataFrame()
+        target = self._target_by_product.loc[product_name]
+        if by_country:
+            positions = self.by_category_country.get((target['Category'], target['Country']))
+        else:
+            positions = self.by_category.get(target['Category'])
+        if positions is None:
+            return pd.DataFrame()
+        positions = positions[self._names[positions] != product_name][:n]
+        if len(positions) == 0:
+            return pd.DataFrame()
+        return self.ordered.iloc[positions]
+
+    def coverage(self):
+        """Number of candidate recommendations for every product, in one vectorized pass.
+
+        Candidates are the rows in the product's category (and country) minus
+        the product's own rows there.
+        """
+        targets = self.targets
+        result = pd.DataFrame({'Product': targets['Product'].to_numpy()})
+        for label, keys in [('v1', ['Category']), ('v2', ['Category', 'Country'])]:
+            group_size = self.data.groupby(keys).size()
+            own_rows = self.data.groupby(['Product'] + keys).size()
+            available = (group_size.reindex(pd.MultiIndex.from_frame(targets[keys])).to_numpy()
+                         - own_rows.reindex(pd.MultiIndex.from_frame(targets[['Product'] + keys]))
+                         .fillna(0).to_numpy())
+            result[f'{label}_candidates'] = available.astype(int)
+        return result
+
+
+def run_benchmark_grouped(data_df, num_recommendations_to_request=5):
+    """Coverage metrics of V1/V2 for every product using the grouped engine."""
+    engine = GroupedRecommender(data_df)
+    coverage = engine.coverage()
+    return {
+        'v1_got_any_recs': int((coverage['v1_candidates'] > 0).sum()),
+        'v1_got_full_recs': int((coverage['v1_candidates'] >= num_recommendations_to_request).sum()),
+        'v2_got_any_recs': int((coverage['v2_candidates'] > 0).sum()),
+        'v2_got_full_recs': int((coverage['v2_candidates'] >= num_recommendations_to_request).sum()),
+    }
+
+
+def cross_check(data_df, num_recommendations_to_request=5):
+    """Verify the grouped engine returns exactly the rows V1/V2 return, for every product."""
+    engine = GroupedRecommender(data_df)
+    mismatches = []
+    for product_name in data_df['Product'].unique():
+        for by_country, original in [(False, recommend_v1_by_category), (True, recommend_v2_by_category_and_country)]:
+            expected = original(product_name, data_df, n=num_recommendations_to_request)
+            actual = engine.recommend(product_name, n=num_recommendations_to_request, by_country=by_country)
+            if list(expected.index) != list(actual.index):
+                mismatches.append((product_name, 'v2' if by_country else 'v1'))
+    return mismatches
+
 # --- Benchmarking Logic ---
 
 def run_benchmark(data_df, num_recommendations_to_request=5):
@@ -189,8 +272,30 @@ def run_benchmark(data_df, num_recommendations_to_request=5):
     else:
         print("  No recommendations.")
 
+    return {
+        'v1_got_any_recs': v1_got_any_recs,
+        'v1_got_full_recs': v1_got_full_recs,
+        'v2_got_any_recs': v2_got_any_recs,
+        'v2_got_full_recs': v2_got_full_recs,
+    }
+
 # Run the benchmark
 if not df.empty:
-    run_benchmark(df, num_recommendations_to_request=5)
+    start = time.perf_counter()
+    original_metrics = run_benchmark(df, num_recommendations_to_request=5)
+    original_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    grouped_metrics = run_benchmark_grouped(df, num_recommendations_to_request=5)
+    grouped_seconds = time.perf_counter() - start
+
+    print("\n--- Engine Comparison ---")
+    print(f"Per-product scan engine: {original_seconds:.3f}s (including report printing)")
+    print(f"Grouped engine:          {grouped_seconds:.3f}s")
+    print(f"Coverage metrics identical: {original_metrics == grouped_metrics}")
+    mismatches = cross_check(df, num_recommendations_to_request=5)
+    print(f"Recommendation rows identical for every product: {not mismatches}")
+    for product_name, algorithm in mismatches[:10]:
+        print(f"  Mismatch for '{product_name}' ({algorithm})")
 else:
     print("Skipping benchmark due to empty DataFrame.")
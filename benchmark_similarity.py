@@ -0,0 +1,108 @@
+"""
+Benchmark the similarity build: dense N x N cosine matrix vs. blocked top-K index.
+
+Every (path, catalog size) combination runs in its own process so the peak
+memory numbers are not polluted by earlier runs.
+
+Usage:
+    python benchmark_similarity.py [--sizes 1000 5000 10000 50000] [--k 50]
+"""
+import argparse
+import multiprocessing
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.recommender import build_feature_matrix
+from src.neighbor_index import build_topk_index
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+CATEGORIES = ['Body care', 'Face care', 'Hair care', 'Home and Accessories', 'Luxury Jewelry', 'Make up']
+COUNTRIES = ['United States', 'United Kingdom', 'France', 'Germany', 'Brazil', 'India', 'Australia']
+
+
+def synthetic_catalog(n_products, seed=42):
+    """Create a product table with the columns the recommender uses."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Product': [f"Product {i}" for i in range(n_products)],
+        'Product ID': [f"P{i}" for i in range(n_products)],
+        'Category': rng.choice(CATEGORIES, n_products),
+        'Country': rng.choice(COUNTRIES, n_products),
+        'Sales': rng.integers(5, 1000, n_products),
+        'Rating': rng.integers(1, 6, n_products),
+        'Product Image URL': '',
+    })
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_case(path, n_products, k, queue):
+    """Build one similarity structure and report time and memory."""
+    features, _ = build_feature_matrix(synthetic_catalog(n_products))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    if path == 'dense':
+        from sklearn.metrics.pairwise import cosine_similarity
+        result = cosine_similarity(features)
+        stored_bytes = result.nbytes
+    else:
+        indices, scores = build_topk_index(features, k=k)
+        stored_bytes = indices.nbytes + scores.nbytes
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue.put({
+        'path': path,
+        'n_products': n_products,
+        'build_seconds': elapsed,
+        'stored_mb': stored_bytes / 1024 ** 2,
+        'traced_peak_mb': traced_peak / 1024 ** 2,
+        'peak_rss_mb': peak_rss_mb(),
+    })
+
+
+def run_case(path, n_products, k):
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_run_case, args=(path, n_products, k, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 10000, 50000])
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--dense-limit', type=int, default=10000,
+                        help="Largest catalog to run the dense path on (it needs N*N*8 bytes)")
+    args = parser.parse_args()
+
+    print(f"{'path':<8}{'products':>10}{'build (s)':>12}{'stored MB':>12}{'traced MB':>12}{'peak RSS MB':>14}")
+    print('-' * 68)
+    for n_products in args.sizes:
+        paths = ['dense', 'topk'] if n_products <= args.dense_limit else ['topk']
+        for path in paths:
+            r = run_case(path, n_products, args.k)
+            rss = f"{r['peak_rss_mb']:.1f}" if r['peak_rss_mb'] is not None else 'n/a'
+            print(f"{r['path']:<8}{r['n_products']:>10}{r['build_seconds']:>12.3f}"
+                  f"{r['stored_mb']:>12.1f}{r['traced_peak_mb']:>12.1f}{rss:>14}")
+
+
+if __name__ == '__main__':
+    main()
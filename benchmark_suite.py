@@ -0,0 +1,202 @@
+"""
+Timing benchmark suite for ProductRecommender, with JSON output for tracking
+regressions between releases.
+
+For each synthetic catalog size (built with the real dataset's columns) it
+times:
+- construction from a CSV file (parse, normalize, aggregate, index build)
+- _update_similarity_matrix (full index rebuild)
+- get_recommendations latency percentiles
+- add_rating latency percentiles and throughput (including batched flushes)
+- the dashboard filter/sort path (category, country, rating, sort mode), with
+  pandas masks and sorts, and with the facet index and presorted orders
+  (first and memoized calls)
+
+Usage:
+    python benchmark_suite.py [--sizes 1000 10000 100000] [--queries 500]
+                              [--ratings 2000] [--output results.json]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.recommender import ProductRecommender, DEFAULT_TOP_K
+from src.facet_index import FacetIndex
+from src.synthetic_data import DATASET_COLUMNS
+from benchmark_similarity import synthetic_catalog, COUNTRIES
+
+SORT_MODES = ["Rating (High to Low)", "Price (Low to High)", "Price (High to Low)"]
+
+
+def dataset_catalog(n_products, seed=42):
+    """Synthetic catalog with every column of the real dataset, one order line per product."""
+    df = synthetic_catalog(n_products, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    quantity = rng.integers(1, 10, n_products)
+    df['Row ID'] = np.arange(1, n_products + 1)
+    df['Order ID'] = [f"ORD-{i}" for i in range(n_products)]
+    df['Order Date'] = '1/1/2024'
+    df['User ID'] = [f"U-{i}" for i in rng.integers(0, max(n_products // 10, 1), n_products)]
+    df['Segment'] = rng.choice(['Consumer', 'Corporate', 'Self-Employed'], n_products)
+    df['City'] = 'City'
+    df['State'] = 'State'
+    df['Country latitude'] = 0.0
+    df['Country longitude'] = 0.0
+    df['Region'] = 'Region'
+    df['Market'] = 'Market'
+    df['Subcategory'] = df['Category'].str.lower()
+    df['Quantity'] = quantity
+    df['Sales'] = df['Sales'] * quantity
+    df['Discount'] = 0.0
+    df['Profit'] = df['Sales'] * 0.4
+    return df[DATASET_COLUMNS]
+
+
+def dashboard_filter_sort(df, category, country, min_rating, sort_by):
+    """The pandas part of the dashboard's filter and sort block."""
+    filtered_data = df.copy()
+    if category != 'All':
+        filtered_data = filtered_data[filtered_data['Category'] == category]
+    if country != 'All':
+        filtered_data = filtered_data[filtered_data['Country'] == country]
+    if min_rating is not None:
+        filtered_data = filtered_data[filtered_data['Rating'] >= min_rating]
+    return sort_products(filtered_data, sort_by)
+
+
+def facet_filter_sort(facets, df, category, country, min_rating, sort_by):
+    """The dashboard's filter and sort block on the facet index and its presorted orders."""
+    positions, _ = facets.select(category, country, min_rating or 0.0, sort_by)
+    return df.take(positions)
+
+
+def sort_products(filtered_data, sort_by):
+    if sort_by == "Rating (High to Low)":
+        return filtered_data.sort_values('Rating', ascending=False)
+    elif sort_by == "Price (Low to High)":
+        return filtered_data.sort_values('Sales', ascending=True)
+    return filtered_data.sort_values('Sales', ascending=False)
+
+
+def latency_stats(samples):
+    """Latency percentiles in milliseconds for a list of durations in seconds."""
+    samples_ms = np.asarray(samples) * 1000
+    return {
+        'calls': len(samples_ms),
+        'p50_ms': float(np.percentile(samples_ms, 50)),
+        'p95_ms': float(np.percentile(samples_ms, 95)),
+        'p99_ms': float(np.percentile(samples_ms, 99)),
+        'mean_ms': float(samples_ms.mean()),
+    }
+
+
+def time_calls(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_size(n_products, n_queries, n_ratings, tmp_dir, seed=0):
+    """Run every benchmark on one catalog size and return its results."""
+    rng = np.random.default_rng(seed)
+    path = os.path.join(tmp_dir, f"catalog_{n_products}.csv")
+    dataset_catalog(n_products).to_csv(path, index=False)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        recommender = ProductRecommender(path, use_snapshot=False)
+    construction = time.perf_counter() - start
+
+    start = time.perf_counter()
+    recommender._update_similarity_matrix()
+    rebuild = time.perf_counter() - start
+
+    names = recommender.data['Product'].to_numpy()
+    queries = [(names[i], 5) for i in rng.integers(0, len(names), n_queries)]
+    recommendations = latency_stats(time_calls(recommender.get_recommendations, queries))
+
+    product_ids = recommender.data['Product ID'].to_numpy()
+    ratings = [(f"user{i % 100}", product_ids[row], int(value))
+               for i, (row, value) in enumerate(zip(rng.integers(0, len(product_ids), n_ratings),
+                                                    rng.integers(1, 6, n_ratings)))]
+    start = time.perf_counter()
+    rating_samples = time_calls(recommender.add_rating, ratings)
+    recommender._ensure_fresh()
+    rating_seconds = time.perf_counter() - start
+    add_rating = latency_stats(rating_samples)
+    add_rating['ratings_per_second'] = n_ratings / rating_seconds
+
+    df = recommender.data
+    # Every sidebar combination of category, two countries, rating filter and sort mode
+    filters = [(df, category, country, min_rating, sort_by)
+               for category, country, min_rating, sort_by in itertools.product(
+                   ['All'] + sorted(df['Category'].unique()), ['All'] + COUNTRIES[:2], [None, 4], SORT_MODES)]
+    filter_sort = latency_stats(time_calls(dashboard_filter_sort, filters))
+
+    start = time.perf_counter()
+    facets = FacetIndex(df)
+    facet_build = time.perf_counter() - start
+    facet_filters = [(facets,) + args for args in filters]
+    facet_cold = latency_stats(time_calls(facet_filter_sort, facet_filters))
+    facet_warm = latency_stats(time_calls(facet_filter_sort, facet_filters))
+
+    return {
+        'n_products': n_products,
+        'construction_seconds': construction,
+        'update_similarity_matrix_seconds': rebuild,
+        'get_recommendations': recommendations,
+        'add_rating': add_rating,
+        'dashboard_filter_sort': filter_sort,
+        'facet_index_build_seconds': facet_build,
+        'facet_filter_sort_first': facet_cold,
+        'facet_filter_sort_memoized': facet_warm,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--ratings', type=int, default=2000)
+    parser.add_argument('--output', help="Write the JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'top_k': DEFAULT_TOP_K,
+        'runs': [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_products in args.sizes:
+            print(f"Benchmarking {n_products} products...", file=sys.stderr)
+            results['runs'].append(run_size(n_products, args.queries, args.ratings, tmp))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
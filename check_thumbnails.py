@@ -0,0 +1,246 @@
+"""
+Offline check of the thumbnail cache (src/thumbnails.py) against a fake HTTP
+server.
+
+FakeHTTP stands in for the image hosts: it serves generated images from a
+dict, counts requests per URL, can fail chosen URLs and adds a fixed
+latency per request. The script checks that:
+- every URL is downloaded once and cached at every size
+- identical images under different URLs are stored once
+- concurrent requests for one URL download it once
+- the least recently used thumbnails are evicted once max_bytes is exceeded,
+  and their files are deleted
+- a new cache on the same directory reuses the index without downloading
+- failed downloads fall back to the original URL and are retried only after
+  retry_after
+- thumbnails fit their size (only when Pillow is installed)
+
+and reports the time to fill one dashboard page cold vs from the cache.
+Exits with status 1 if a check fails.
+
+Usage:
+    python check_thumbnails.py [--latency 0.05] [--page-size 24]
+"""
+import argparse
+import io
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from src.thumbnails import ThumbnailCache, SIZES, Image
+
+
+class FakeHTTP:
+    """Fetcher serving images from a dict, with request counts, failures and latency."""
+
+    def __init__(self, images, latency=0.0, failing=()):
+        self.images = images
+        self.latency = latency
+        self.failing = set(failing)
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        with self._lock:
+            self.requests[url] += 1
+        time.sleep(self.latency)
+        if url in self.failing or url not in self.images:
+            raise OSError(f"HTTP Error 404: Not Found ({url})")
+        return self.images[url]
+
+
+def fake_image(seed, side=1080):
+    """A full-size test image (a real JPEG with Pillow, JPEG-signed bytes without)."""
+    if Image is None:
+        return b'\xff\xd8\xff' + bytes([seed % 256]) * (side * 8)
+    # A gradient with some noise compresses about like a product shot (~150 KB at 1080px)
+    size = (side, side * 3 // 4)
+    gradient = Image.linear_gradient('L').resize(size)
+    noise = Image.effect_noise(size, 30 + seed % 16)
+    image = Image.merge('RGB', (Image.blend(gradient, noise, 0.3), gradient.point(lambda v: (v + seed * 37) % 256),
+                                Image.blend(gradient, noise, 0.15)))
+    out = io.BytesIO()
+    image.save(out, format='JPEG', quality=90)
+    return out.getvalue()
+
+
+def product_url(i):
+    return f"https://images.example.com/product-{i}.jpg?sw=1080"
+
+
+def check_downloads_once(directory, problems):
+    http = FakeHTTP({product_url(i): fake_image(i) for i in range(10)})
+    cache = ThumbnailCache(directory, fetcher=http)
+    urls = [product_url(i) for i in range(10)]
+    first = cache.urls(urls, 130)
+    for size in SIZES:
+        cache.urls(urls, size)
+    if any(count != 1 for count in http.requests.values()) or len(http.requests) != 10:
+        problems.append(f"expected one download per URL, got {dict(http.requests)}")
+    if len(cache) != 10 * len(SIZES):
+        problems.append(f"expected {10 * len(SIZES)} thumbnails, got {len(cache)}")
+    if any(url == thumbnail for url, thumbnail in zip(urls, first)):
+        problems.append("a cached image was served from its remote URL")
+    if cache.path(urls[0], 200) is None or not cache.path(urls[0], 200).exists():
+        problems.append("thumbnail file missing on disk")
+    cache.close()
+
+    # A new cache on the same directory serves everything from the saved index
+    reopened = ThumbnailCache(directory, fetcher=http)
+    if reopened.urls(urls, 130) != first or sum(http.requests.values()) != 10:
+        problems.append("reopened cache did not reuse the index")
+    reopened.close()
+
+
+def check_content_addressing(directory, problems):
+    image = fake_image(1)
+    http = FakeHTTP({'https://a.example.com/x.jpg': image, 'https://b.example.com/y.jpg': image})
+    cache = ThumbnailCache(directory, fetcher=http)
+    a, b = cache.urls(['https://a.example.com/x.jpg', 'https://b.example.com/y.jpg'], 130)
+    if a != b:
+        problems.append("identical images were stored twice")
+    files = [path for path in cache.directory.rglob('*') if path.is_file() and path.name != 'index.json']
+    # Without Pillow every size is the original image, so all sizes share one file too
+    expected = len(SIZES) if Image is not None else 1
+    if len(files) != expected:
+        problems.append(f"expected {expected} files for one image, found {len(files)}")
+    cache.close()
+
+
+def check_concurrent_requests(directory, problems):
+    http = FakeHTTP({product_url(0): fake_image(0)}, latency=0.1)
+    cache = ThumbnailCache(directory, fetcher=http)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.url(product_url(0), 130))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if http.requests[product_url(0)] != 1:
+        problems.append(f"8 concurrent requests caused {http.requests[product_url(0)]} downloads")
+    if len(set(results)) != 1 or results[0] == product_url(0):
+        problems.append("concurrent requests got different or uncached URLs")
+    cache.close()
+
+
+def check_lru_eviction(directory, problems):
+    http = FakeHTTP({product_url(i): fake_image(i) for i in range(20)})
+    probe_directory = tempfile.mkdtemp()
+    try:
+        probe = ThumbnailCache(probe_directory, fetcher=http)
+        probe.url(product_url(0), 130)
+        per_image = probe.total_bytes
+        probe.close()
+    finally:
+        shutil.rmtree(probe_directory)
+
+    # Room for about 5 images at every size
+    cache = ThumbnailCache(directory, max_bytes=int(per_image * 5.5), fetcher=http)
+    for i in range(5):
+        cache.url(product_url(i), 130)
+    cache.url(product_url(0), 130)      # Touch the oldest image, so product 1 is now the LRU
+    for i in range(5, 8):
+        cache.url(product_url(i), 130)
+    if cache.total_bytes > cache.max_bytes:
+        problems.append(f"cache holds {cache.total_bytes} bytes, over its {cache.max_bytes} limit")
+    if cache.stats['evictions'] == 0:
+        problems.append("nothing was evicted")
+    before = http.requests[product_url(0)]
+    cache.url(product_url(0), 130)
+    if http.requests[product_url(0)] != before:
+        problems.append("recently used thumbnail was evicted")
+    before = http.requests[product_url(1)]
+    cache.url(product_url(1), 130)
+    if http.requests[product_url(1)] != before + 1:
+        problems.append("least recently used thumbnail was not evicted")
+    files = [path for path in cache.directory.rglob('*.*') if path.parent != cache.directory]
+    on_disk = sum(path.stat().st_size for path in files)
+    if on_disk != cache.total_bytes:
+        problems.append(f"evicted files left on disk ({on_disk} bytes on disk, {cache.total_bytes} indexed)")
+    cache.close()
+
+
+def check_failures(directory, problems):
+    broken = "https://via.placeholder.com/140x140?text=No+Image"
+    http = FakeHTTP({}, failing=[broken])
+    cache = ThumbnailCache(directory, fetcher=http, retry_after=60)
+    if cache.url(broken, 140) != broken or cache.path(broken, 140) is not None:
+        problems.append("failed download did not fall back to the original URL")
+    cache.url(broken, 140)
+    if http.requests[broken] != 1:
+        problems.append(f"failed URL retried {http.requests[broken]} times within retry_after")
+    cache.retry_after = 0
+    http.failing.clear()
+    http.images[broken] = fake_image(3)
+    if cache.url(broken, 140) == broken:
+        problems.append("failed URL not retried after retry_after")
+    cache.close()
+
+
+def check_sizes(directory, problems):
+    if Image is None:
+        print("Pillow not installed: skipping the thumbnail size check (images are cached at full size)")
+        return
+    http = FakeHTTP({product_url(0): fake_image(0)})
+    cache = ThumbnailCache(directory, fetcher=http)
+    for size in SIZES:
+        with Image.open(cache.path(product_url(0), size)) as image:
+            if max(image.size) != size:
+                problems.append(f"{size}px thumbnail is {image.size}")
+    cache.close()
+
+
+def time_page(directory, latency, page_size):
+    http = FakeHTTP({product_url(i): fake_image(i) for i in range(page_size)}, latency=latency)
+    cache = ThumbnailCache(directory, fetcher=http)
+    urls = [product_url(i) for i in range(page_size)]
+    start = time.perf_counter()
+    cache.urls(urls, 130)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    cache.urls(urls, 130)
+    warm = time.perf_counter() - start
+    thumbnail_bytes = sum(cache.path(url, 130).stat().st_size for url in urls)
+    original_bytes = sum(len(data) for data in http.images.values())
+    cache.close()
+    print(f"One page of {page_size} images, {latency * 1000:.0f} ms per request: "
+          f"cold {cold * 1000:.0f} ms (serial downloads would take {latency * page_size * 1000:.0f} ms), "
+          f"cached {warm * 1000:.2f} ms")
+    print(f"Bytes per page sent to the browser: {original_bytes / 1024:.0f} KB originals, "
+          f"{thumbnail_bytes / 1024:.0f} KB thumbnails")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds per fake request")
+    parser.add_argument('--page-size', type=int, default=24)
+    args = parser.parse_args()
+
+    problems = []
+    checks = [check_downloads_once, check_content_addressing, check_concurrent_requests, check_lru_eviction,
+              check_failures, check_sizes]
+    for check in checks:
+        directory = tempfile.mkdtemp()
+        try:
+            check(directory, problems)
+        finally:
+            shutil.rmtree(directory)
+    directory = tempfile.mkdtemp()
+    try:
+        time_page(directory, args.latency, args.page_size)
+    finally:
+        shutil.rmtree(directory)
+
+    if problems:
+        print("Problems:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print(f"All {len(checks)} checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 
+from src.data_prep import normalize_dataset
+
 # Set page configuration
 st.set_page_config(
     page_title="Simple Product Display",
@@ -27,18 +29,8 @@ def load_data():
             st.error("Could not load any dataset")
             return None
     
-    # Clean data
-    df['Rating'] = df['Rating'].fillna(0)
-    df['Sales'] = df['Sales'].fillna(0)
-    df['Product'] = df['Product'].fillna('Unnamed Product')
-    df['Country'] = df['Country'].fillna('Unknown')
-    df['Category'] = df['Category'].fillna('Uncategorized')
-    
-    # Ensure Product Image URL is valid
-    for i, row in df.iterrows():
-        if pd.isna(row['Product Image URL']) or not isinstance(row['Product Image URL'], str) or row['Product Image URL'].strip() == '':
-            category = str(row['Category']).replace(' ', '+')
-            df.at[i, 'Product Image URL'] = f"https://via.placeholder.com/140x140?text={category}"
+    # Clean data and ensure Product Image URL is valid
+    normalize_dataset(df)
     
     # Print debug info
     st.sidebar.write(f"Total products loaded: {len(df)}")
@@ -0,0 +1,130 @@
+"""
+Approximate nearest-neighbor (IVF) index for product feature vectors.
+
+The exact top-K build scores every product against every other product,
+which is O(N^2). An inverted-file index clusters the unit feature vectors
+with spherical k-means and only scores products in the few clusters closest
+to the query ("probes"). That trades a small recall loss for roughly
+n_lists / n_probe times less work per query and per build.
+
+The index only stores the cluster centroids and which rows belong to each
+cluster; vectors are read from the caller's unit feature matrix, so rating
+updates to that matrix are seen by later searches.
+"""
+import numpy as np
+from typing import Optional, Tuple
+
+# Import top-K selection - handle both module import approaches
+try:
+    from neighbor_index import select_topk, DEFAULT_TOP_K
+except ModuleNotFoundError:
+    from src.neighbor_index import select_topk, DEFAULT_TOP_K
+
+DEFAULT_PROBES = 8
+KMEANS_ITERATIONS = 10
+# k-means is fitted on a sample of this many points per cluster
+KMEANS_SAMPLE_PER_LIST = 64
+
+
+def default_list_count(n_rows: int) -> int:
+    """Number of clusters for n rows: about 4 * sqrt(n)."""
+    return int(max(1, min(n_rows, round(4 * np.sqrt(n_rows)))))
+
+
+class IVFIndex:
+    """Inverted-file index: rows grouped by their nearest k-means centroid."""
+
+    def __init__(self, centroids: np.ndarray, ids: np.ndarray, offsets: np.ndarray):
+        self.centroids = centroids  # (n_lists, d) unit vectors
+        self.ids = ids              # Row positions grouped by cluster
+        self.offsets = offsets      # Cluster c holds ids[offsets[c]:offsets[c + 1]]
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, unit: np.ndarray, n_lists: Optional[int] = None, seed: int = 0,
+              block_size: int = 65536) -> 'IVFIndex':
+        """Cluster the rows of a row-normalized matrix with spherical k-means."""
+        n_rows = unit.shape[0]
+        if n_rows == 0:
+            # No rows to sample: an index with no clusters (build_topk returns empty lists)
+            return cls(np.empty((0, unit.shape[1]), dtype=np.float32), np.empty(0, dtype=np.int64),
+                       np.zeros(1, dtype=np.int64))
+        n_lists = default_list_count(n_rows) if n_lists is None else max(1, min(n_lists, n_rows))
+        rng = np.random.default_rng(seed)
+        sample = unit[rng.choice(n_rows, min(n_rows, n_lists * KMEANS_SAMPLE_PER_LIST), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.stack([np.bincount(assign, weights=sample[:, j], minlength=n_lists)
+                             for j in range(sample.shape[1])], axis=1)
+            norms = np.linalg.norm(sums, axis=1)
+            # Empty clusters restart from a random sample point
+            empty = norms == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            norms[empty] = np.linalg.norm(sums[empty], axis=1)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms[:, np.newaxis]).astype(np.float32)
+
+        assign = np.concatenate([np.argmax(unit[start:start + block_size] @ centroids.T, axis=1)
+                                 for start in range(0, n_rows, block_size)])
+        ids = np.argsort(assign, kind='stable').astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))]).astype(np.int64)
+        return cls(centroids, ids, offsets)
+
+    def _candidates(self, query: np.ndarray, n_probe: int, min_candidates: int) -> np.ndarray:
+        """Rows in the n_probe nearest clusters (more if needed to reach min_candidates)."""
+        order = np.argsort(-(self.centroids @ query), kind='stable')
+        sizes = np.diff(self.offsets)[order]
+        enough = np.searchsorted(np.cumsum(sizes), min_candidates) + 1
+        probes = order[:max(n_probe, enough)]
+        return np.concatenate([self.ids[self.offsets[c]:self.offsets[c + 1]] for c in probes])
+
+    def search(self, unit: np.ndarray, row: int, n: int,
+               n_probe: int = DEFAULT_PROBES) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate n best neighbors of one row, itself excluded."""
+        n = min(n, unit.shape[0] - 1)
+        if n <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        candidates = self._candidates(unit[row], n_probe, n + 1)
+        candidates = candidates[candidates != row]
+        top, top_scores = select_topk((unit[candidates] @ unit[row])[np.newaxis, :], n)
+        return candidates[top[0]], top_scores[0]
+
+    def build_topk(self, unit: np.ndarray, k: int = DEFAULT_TOP_K,
+                   n_probe: int = DEFAULT_PROBES) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-K lists for every row, in the (N, K) layout of build_topk_index.
+
+        All rows of a cluster share the candidate set of that cluster's
+        centroid, so every cluster is one (members x candidates) product.
+        """
+        n_rows = unit.shape[0]
+        k = max(0, min(k, n_rows - 1))
+        indices = np.empty((n_rows, k), dtype=np.int32)
+        scores = np.empty((n_rows, k), dtype=np.float32)
+        if k == 0:
+            return indices, scores
+
+        for cluster in range(self.n_lists):
+            members = self.ids[self.offsets[cluster]:self.offsets[cluster + 1]]
+            if len(members) == 0:
+                continue
+            candidates = self._candidates(self.centroids[cluster], n_probe, k + 1)
+            block = unit[members] @ unit[candidates].T
+            # Exclude each product from its own neighbor list
+            member_pos, candidate_pos = np.nonzero(members[:, np.newaxis] == candidates[np.newaxis, :])
+            block[member_pos, candidate_pos] = -np.inf
+            top, top_scores = select_topk(block, k)
+            indices[members], scores[members] = candidates[top], top_scores
+        return indices, scores
+
+    def arrays(self):
+        """The index as plain arrays, e.g. for a snapshot."""
+        return {'ann_centroids': self.centroids, 'ann_ids': self.ids, 'ann_offsets': self.offsets}
+
+    @classmethod
+    def from_arrays(cls, arrays) -> 'IVFIndex':
+        return cls(arrays['ann_centroids'], arrays['ann_ids'], arrays['ann_offsets'])
@@ -0,0 +1,157 @@
+"""
+HTML product cards for the dashboard, rendered a whole grid at a time.
+
+Emitting a card as separate st.markdown / st.image calls makes every card
+5-7 Streamlit elements, each one a delta message the browser has to
+reconcile. Here the card template is filled in column by column (one
+vectorized string operation per field over all products) and a whole grid
+is returned as a single HTML block for one st.markdown call.
+
+Text fields are HTML-escaped. Dollar signs are written as entities so
+Streamlit's markdown never reads two prices as a LaTeX formula.
+"""
+import html
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Import schema and thumbnail cache - handle both module import approaches
+try:
+    from schema import DatasetSchema, resolve_schema
+    from thumbnails import ThumbnailCache
+except ModuleNotFoundError:
+    from src.schema import DatasetSchema, resolve_schema
+    from src.thumbnails import ThumbnailCache
+
+PRODUCTS_PER_ROW = 3
+IMAGE_WIDTH = 130
+DEFAULT_ACCENT = '#F39C12'
+# Stars for ratings 0-5
+STARS = np.array(['★' * i + '☆' * (5 - i) for i in range(6)], dtype=object)
+
+# Sent once per block. !important because the dashboard resets padding, backgrounds
+# and shadows of every div.
+CARD_CSS = """<style>
+.card-grid { display: grid !important; grid-template-columns: repeat(var(--card-columns), minmax(0, 1fr)); gap: 16px; margin-bottom: 16px !important; }
+.card-grid .card { background-color: white !important; border-radius: 18px !important; box-shadow: 0 2px 5px rgba(0,0,0,0.1) !important; padding: 15px !important; }
+.card-grid img { object-fit: contain; display: block; margin-bottom: 10px; }
+.card-grid .name { font-weight: bold; margin-bottom: 4px !important; }
+.card-grid .price { color: #B12704; font-weight: bold; font-size: 18px; }
+.card-grid .badge { background-color: rgba(195, 106, 45, 0.1) !important; color: #C36A2D; padding: 3px 8px !important; border-radius: 12px !important; font-size: 0.85em; margin-left: 8px !important; }
+.card-grid .details { color: #565959; font-size: 14px; }
+.card-grid .stars { color: #FFA41C; }
+.card-grid .card.accent { border-left: 4px solid var(--accent) !important; }
+.card-grid .accent .details { color: var(--accent); }
+.card-grid .note { color: var(--accent, #565959); font-weight: bold; }
+</style>"""
+
+
+def placeholder_image(width: int) -> str:
+    return f"https://via.placeholder.com/{width}x{width}?text=No+Image"
+
+
+# Element-wise helpers over object arrays (pandas' per-call overhead dominates for a page of cards)
+_escape = np.frompyfunc(lambda value: html.escape(str(value)), 1, 1)
+_format_price = np.frompyfunc('{:.2f}'.format, 1, 1)
+
+
+def _column(values, length: int) -> np.ndarray:
+    """Values as an object array of escaped strings (empty for missing values)."""
+    if values is None:
+        return np.full(length, '', dtype=object)
+    values = np.asarray(values, dtype=object)
+    text = _escape(values).astype(object)
+    text[pd.isna(values)] = ''
+    return text
+
+
+def _numbers(values) -> np.ndarray:
+    """Values as floats (0 for missing or non-numeric values)."""
+    return np.nan_to_num(pd.to_numeric(np.asarray(values, dtype=object), errors='coerce').astype(float))
+
+
+def render_cards(names, prices, ratings, categories=None, countries=None, images=None, badges=None,
+                 image_width: int = IMAGE_WIDTH, columns: int = PRODUCTS_PER_ROW, accents=None, notes=None) -> str:
+    """One HTML block with a card per product, laid out `columns` to a row.
+
+    All arguments are equal-length columns (lists, arrays or Series); missing
+    images get a placeholder. `badges` (e.g. "87% match") are optional, as
+    are `accents` (CSS colors for the card's left border and details) and
+    `notes` (a bold line under the stars, e.g. "Similarity: 0.87").
+    """
+    n = len(names)
+    if n == 0:
+        return ''
+    stars = STARS[np.clip(_numbers(ratings), 0, 5).astype(int)]
+
+    image_urls = _column(images, n)
+    image_urls[image_urls == ''] = placeholder_image(image_width)
+    details = _column(categories, n)
+    if countries is not None:
+        details = details + ' | ' + _column(countries, n)
+    badge = _column(badges, n)
+    if badges is not None:
+        badge = '<span class="badge">' + badge + '</span>'
+
+    card = np.full(n, '<div class="card">', dtype=object)
+    if accents is not None:
+        card = '<div class="card accent" style="--accent: ' + _column(accents, n) + ';">'
+    note = _column(notes, n)
+    if notes is not None:
+        note = '<div class="note">' + note + '</div>'
+
+    cards = (card + '<img src="' + image_urls + f'" width="{image_width}" height="{image_width}">'
+             + '<div class="name">' + _column(names, n) + '</div>'
+             + '<div><span class="price">&#36;' + _format_price(_numbers(prices)) + '</span>' + badge + '</div>'
+             + '<div class="details">' + details + '</div>'
+             + '<div class="stars">' + stars + '</div>' + note + '</div>')
+    return (CARD_CSS + f'<div class="card-grid" style="--card-columns: {columns};">'
+            + ''.join(cards) + '</div>')
+
+
+def _thumbnail_urls(images, image_width: int, thumbnails: Optional[ThumbnailCache]):
+    """Image URLs served from the thumbnail cache, if one is given."""
+    if thumbnails is None or images is None:
+        return images
+    return thumbnails.urls(images, image_width)
+
+
+def product_cards(data: pd.DataFrame, schema: Optional[DatasetSchema] = None,
+                  image_width: int = IMAGE_WIDTH, columns: int = PRODUCTS_PER_ROW,
+                  thumbnails: Optional[ThumbnailCache] = None) -> str:
+    """Cards for the rows of a product table (columns resolved from `schema`)."""
+    if schema is None:
+        schema = resolve_schema(data.columns)
+
+    def column(name):
+        return data[name] if name else None
+
+    images = _thumbnail_urls(column(schema.image), image_width, thumbnails)
+    return render_cards(data[schema.name], column(schema.price), column(schema.rating), column(schema.category),
+                        column(schema.country), images, image_width=image_width, columns=columns)
+
+
+def recommendation_cards(recommendations: List[Dict], image_width: int = IMAGE_WIDTH,
+                         columns: int = PRODUCTS_PER_ROW, thumbnails: Optional[ThumbnailCache] = None,
+                         category_accents: Optional[Dict[str, str]] = None,
+                         default_accent: str = DEFAULT_ACCENT) -> str:
+    """Cards for recommendation dicts, with the similarity as a "% match" badge.
+
+    With `category_accents` (category -> CSS color) every card is accented in
+    its category's color and shows the similarity as a "Similarity: 0.87"
+    line instead of the badge.
+    """
+    if not recommendations:
+        return ''
+    recs = pd.DataFrame(recommendations)
+    similarity = recs['similarity'].astype(float)
+    images = _thumbnail_urls(recs['image_url'], image_width, thumbnails)
+    if category_accents is None:
+        badges = (similarity * 100).astype(int).astype(str) + '% match'
+        return render_cards(recs['name'], recs['price'], recs['rating'], recs['category'],
+                            images=images, badges=badges, image_width=image_width, columns=columns)
+    accents = recs['category'].map(category_accents).fillna(default_accent)
+    notes = 'Similarity: ' + similarity.map('{:.2f}'.format)
+    return render_cards(recs['name'], recs['price'], recs['rating'], recs['category'], images=images,
+                        image_width=image_width, columns=columns, accents=accents, notes=notes)
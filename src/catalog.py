@@ -0,0 +1,67 @@
+"""
+Collapse order-line data into a product catalog.
+
+The dataset has one row per order line (Order ID, User ID, Quantity, Profit),
+so the same product appears many times. The recommender and the dashboard
+work on products, so we group the order lines into one row per product with
+aggregated sales, mean rating, order count and unique buyers.
+"""
+import pandas as pd
+from typing import Optional
+
+# Import column schema - handle both module import approaches
+try:
+    from schema import DatasetSchema, resolve_schema
+except ModuleNotFoundError:
+    from src.schema import DatasetSchema, resolve_schema
+
+# Columns that describe a single order line rather than the product
+ORDER_LEVEL_COLUMNS = ['Row ID', 'Order ID', 'Order Date', 'User ID', 'Segment', 'City', 'State', 'Discount']
+
+
+def build_product_catalog(orders: pd.DataFrame, schema: Optional[DatasetSchema] = None) -> pd.DataFrame:
+    """Group order lines into one row per product.
+
+    Products are keyed by (Product ID, name): in our data the same Product ID
+    is sometimes used for differently named products, and those must stay
+    separate in the dashboard. Descriptive columns come from an order line in
+    the product's most common country. Added columns:
+    - Sales: mean order-line value (what the dashboard shows as price)
+    - Total Sales, Quantity, Profit: sums over all order lines
+    - Rating: mean rating
+    - Order Count: number of distinct orders
+    - Unique Buyers: number of distinct users
+    """
+    if schema is None:
+        schema = resolve_schema(orders.columns)
+    keys = [col for col in (schema.product_id, schema.name) if col is not None]
+    if not keys or orders.empty:
+        return orders.copy()
+
+    # Representative order line per product: the first one in its most common country
+    if schema.country is not None:
+        lines_in_country = orders.groupby(keys + [schema.country], sort=False, dropna=False)[keys[0]].transform('size')
+        ranked = orders.assign(_lines=lines_in_country.to_numpy()).sort_values('_lines', ascending=False, kind='stable')
+        representative = ranked.drop_duplicates(keys).sort_index().drop(columns='_lines')
+    else:
+        representative = orders.drop_duplicates(keys)
+    product_columns = [col for col in orders.columns if col not in ORDER_LEVEL_COLUMNS and col != schema.user]
+    catalog = representative[product_columns].set_index(keys)
+
+    grouped = orders.groupby(keys, sort=False, dropna=False)
+    if schema.price is not None:
+        catalog[schema.price] = grouped[schema.price].mean()
+        catalog['Total Sales'] = grouped[schema.price].sum()
+    if schema.rating is not None:
+        catalog[schema.rating] = grouped[schema.rating].mean()
+    for col in ('Quantity', 'Profit'):
+        if col in orders.columns:
+            catalog[col] = grouped[col].sum()
+    if 'Order ID' in orders.columns:
+        catalog['Order Count'] = grouped['Order ID'].nunique()
+    else:
+        catalog['Order Count'] = grouped.size()
+    if 'User ID' in orders.columns:
+        catalog['Unique Buyers'] = grouped['User ID'].nunique()
+
+    return catalog.reset_index()[product_columns + [col for col in catalog.columns if col not in product_columns]]
@@ -0,0 +1,120 @@
+"""
+Item-item collaborative filtering on a sparse user x item interaction matrix.
+
+Two products are similar when the same users bought or rated them. Item
+vectors are the columns of the user x item matrix, so cosine similarity is a
+sparse matrix product. It is computed for a block of items at a time and
+pruned to the top K per item, producing the same (N, K) neighbor lists as the
+content-based index in neighbor_index.py.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Tuple
+
+# Import neighbor index defaults - handle both module import approaches
+try:
+    from neighbor_index import DEFAULT_TOP_K, DEFAULT_BLOCK_SIZE
+except ModuleNotFoundError:
+    from src.neighbor_index import DEFAULT_TOP_K, DEFAULT_BLOCK_SIZE
+
+
+def build_interaction_matrix(users: np.ndarray, items: np.ndarray, values: np.ndarray,
+                             n_items: int) -> sparse.csr_matrix:
+    """Build the (users x items) interaction matrix.
+
+    Repeated (user, item) pairs keep their strongest interaction, so a user
+    who bought a product five times counts the same as one who bought it once.
+    """
+    interactions = pd.DataFrame({'user': users, 'item': items, 'value': values})
+    interactions = interactions.groupby(['user', 'item'], sort=False)['value'].max().reset_index()
+    user_codes, user_labels = pd.factorize(interactions['user'])
+    return sparse.csr_matrix(
+        (interactions['value'].to_numpy(dtype=np.float32), (user_codes, interactions['item'].to_numpy())),
+        shape=(len(user_labels), n_items))
+
+
+def normalize_items(interactions: sparse.spmatrix) -> sparse.csr_matrix:
+    """Scale every item column to unit length and return the (items x users) matrix.
+
+    Rows of the result are unit item vectors, so a product of two rows is
+    their cosine similarity. Items without interactions stay all-zero.
+    """
+    item_users = sparse.csr_matrix(interactions.T, dtype=np.float32)
+    norms = np.sqrt(np.asarray(item_users.multiply(item_users).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms).dot(item_users), dtype=np.float32)
+
+
+def similarity_rows(item_users: sparse.csr_matrix, rows: np.ndarray) -> np.ndarray:
+    """Dense cosine scores of `rows` against every item, with each item's own score set to -inf."""
+    rows = np.asarray(rows, dtype=np.int64)
+    block = (item_users[rows] @ item_users.T).toarray()
+    block[np.arange(len(rows)), rows] = -np.inf
+    return block
+
+
+def build_item_topk(item_users: sparse.csr_matrix, k: int = DEFAULT_TOP_K,
+                    block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-K item-item cosine neighbor lists from normalize_items() output.
+
+    Returns (indices, scores) of shape (N, K) sorted by descending score,
+    without the item itself. Only co-occurring items have a nonzero score;
+    items with fewer than K of them are padded with the most popular items
+    at score 0, so every list is full.
+    """
+    n_items = item_users.shape[0]
+    k = max(0, min(k, n_items - 1))
+    indices = np.empty((n_items, k), dtype=np.int32)
+    scores = np.zeros((n_items, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    # Padding candidates: enough popular items to fill any list after skipping self and neighbors
+    popularity = np.diff(item_users.indptr)
+    popular = np.argsort(-popularity, kind='stable')[:2 * k + 1]
+    user_items = item_users.T.tocsr()
+
+    for start in range(0, n_items, block_size):
+        stop = min(start + block_size, n_items)
+        block = sparse.csr_matrix(item_users[start:stop] @ user_items)
+        block_rows = np.repeat(np.arange(stop - start), np.diff(block.indptr))
+        cols, data = block.indices, block.data
+
+        # Drop each item's own entry and zero scores
+        keep = (cols != block_rows + start) & (data > 0)
+        block_rows, cols, data = block_rows[keep], cols[keep], data[keep]
+
+        # Popular items co-occur with thousands of others: prune those rows to
+        # entries at or above their K-th best score before sorting
+        row_starts = np.searchsorted(block_rows, np.arange(stop - start + 1))
+        threshold = np.zeros(stop - start, dtype=data.dtype)
+        for row in np.flatnonzero(np.diff(row_starts) > k):
+            row_data = data[row_starts[row]:row_starts[row + 1]]
+            threshold[row] = np.partition(row_data, len(row_data) - k)[len(row_data) - k]
+        keep = data >= threshold[block_rows]
+        block_rows, cols, data = block_rows[keep], cols[keep], data[keep]
+
+        # Rank the remaining entries within their row
+        order = np.lexsort((-data, block_rows))
+        block_rows, cols, data = block_rows[order], cols[order], data[order]
+        row_starts = np.searchsorted(block_rows, np.arange(stop - start))
+        rank = np.arange(len(block_rows)) - row_starts[block_rows]
+        top = rank < k
+
+        chosen = np.full((stop - start, k), -1, dtype=np.int64)
+        chosen[block_rows[top], rank[top]] = cols[top]
+        scores[start:stop][block_rows[top], rank[top]] = data[top]
+        counts = np.minimum(np.bincount(block_rows, minlength=stop - start), k)
+
+        # Fill short lists with popular items that are not the item itself or already listed
+        short = np.flatnonzero(counts < k)
+        if len(short):
+            taken = (chosen[short, :, np.newaxis] == popular).any(axis=1)
+            allowed = ~taken & (popular != (short + start)[:, np.newaxis])
+            position = np.cumsum(allowed, axis=1) - 1 + counts[short, np.newaxis]
+            fill_rows, fill_cols = np.nonzero(allowed & (position < k))
+            chosen[short[fill_rows], position[fill_rows, fill_cols]] = popular[fill_cols]
+        indices[start:stop] = chosen
+
+    return indices, scores
@@ -9,9 +9,17 @@ import altair as alt
 # Import recommender - handle both module import approaches
 try:
     from recommender import ProductRecommender
+    from facet_index import FacetIndex
+    from pagination import PAGE_SIZES, DEFAULT_PAGE_SIZE, PAGE_KEY, page_count, page_bounds, current_page
+    from cards import product_cards, recommendation_cards
+    from thumbnails import ThumbnailCache
     import datetime  # When running from src directory
 except ModuleNotFoundError:
     from src.recommender import ProductRecommender  # When running as a module
+    from src.facet_index import FacetIndex
+    from src.pagination import PAGE_SIZES, DEFAULT_PAGE_SIZE, PAGE_KEY, page_count, page_bounds, current_page
+    from src.cards import product_cards, recommendation_cards
+    from src.thumbnails import ThumbnailCache
 
 # Set page configuration
 st.set_page_config(
@@ -239,7 +247,7 @@ def display_uniform_image(image_url):
             return
             
         # Apply direct width control
-        st.image(image_url, width=140)
+        st.image(thumbnail_image(image_url, 140), width=140)
     except Exception as e:
         # Fallback to a placeholder image if there's any error
         st.image("https://via.placeholder.com/140x140?text=Image+Error", width=140)
@@ -272,7 +280,8 @@ def load_recommender():
     print(f"Using data from: {data_path}")
     
     # Load the recommender model with the correct data path
-    recommender = ProductRecommender(str(data_path))
+    # Rating updates and rebuilds run on a background thread; sessions keep using the current model
+    recommender = ProductRecommender(str(data_path), background_rebuild=True)
     
     # Get the dataframe
     df = recommender.data
@@ -283,13 +292,8 @@ def load_recommender():
     print(df['Category'].value_counts())
     
     # CRITICAL FIX: DO NOT FILTER OUT ANY PRODUCTS
-    # Simply replace missing/broken image URLs with placeholders
-    
-    # First, ensure all products have an image URL by replacing missing/empty ones
-    for index, row in df.iterrows():
-        if not isinstance(row['Product Image URL'], str) or not row['Product Image URL'].strip():
-            category = row['Category'].replace(' ', '+') if isinstance(row['Category'], str) else 'Product'
-            df.at[index, 'Product Image URL'] = f"https://via.placeholder.com/140x140?text={category}"
+    # Missing/broken image URLs were already replaced with placeholders by
+    # normalize_dataset while the recommender loaded the data
     
     # Special handling for problematic categories to ensure they're visible
     # Make sure Luxury Jewelry and Make up categories have products and valid images
@@ -308,9 +312,8 @@ def load_recommender():
     if placeholder_count > 0:
         st.sidebar.info(f"ℹ️ Note: {placeholder_count} products are displayed with placeholder images.")
     
-    # Update the recommender's dataframe with our modified version
-    recommender.data = df
-    
+    # The recommender is shared by every session: treat recommender.data as read-only
+    # (assigning or editing it would swap the model under other sessions)
     return recommender
     
 # Load the recommender and get the dataframe
@@ -320,25 +323,29 @@ if recommender is None:
     st.stop()
 
 # Get the dataframe from the recommender
+# (missing values were already filled once at load by normalize_dataset)
 df = recommender.data
 
-# Clean up any rows with missing values
-try:
-    df['Rating'] = df['Rating'].fillna(0)
-    df['Sales'] = df['Sales'].fillna(0)
-    df['Category'] = df['Category'].fillna('Uncategorized')
-    df['Product'] = df['Product'].fillna('Unnamed Product')
-    
-    # Check if Country column exists before filling NA values
-    if 'Country' in df.columns:
-        df['Country'] = df['Country'].fillna('Unknown')
-    else:
-        # If Country column doesn't exist, create it with default value
-        df['Country'] = 'Global'  # Set a default value for all products
-        print("Note: Country column was missing and has been added with default value 'Global'")
-except Exception as e:
-    print(f"Error during data cleanup: {e}")
-    # Continue with available columns
+# Facet index of the product table (filters and presorted orders): built once per table
+# and shared by all sessions
+@st.cache_resource
+def load_facet_index(_data, data_id):
+    return FacetIndex(_data)
+
+facets = load_facet_index(df, id(df))
+
+# Product image thumbnails: downloaded once, resized and served from src/static
+# (static serving is enabled in .streamlit/config.toml); shared by all sessions
+@st.cache_resource
+def load_thumbnail_cache():
+    return ThumbnailCache()
+
+thumbnails = load_thumbnail_cache()
+
+def thumbnail_image(image_url, width):
+    """Local thumbnail file for st.image, or the original URL if it cannot be cached."""
+    path = thumbnails.path(image_url, width) if isinstance(image_url, str) and image_url else None
+    return str(path) if path is not None else image_url
 
 # Print information about each category
 categories_count = df.groupby('Category').size().reset_index(name='count')
@@ -369,23 +376,14 @@ def get_personalized_recommendations(num_recommendations=6):
         # Use the three most recently viewed products for recommendations
         recent_products = st.session_state['viewed_products'][:3]
         
-        # Get recommendations for each recently viewed product
-        for product_name in recent_products:
-            similar_products = recommender.get_recommendations(product_name, n=3)
-            if similar_products:
-                for product in similar_products:
-                    # Check if this product is already in our recommendations
-                    if not any(rec['name'] == product['name'] for rec in recommendations):
-                        recommendations.append(product)
-                        if len(recommendations) >= num_recommendations:
-                            break
-            if len(recommendations) >= num_recommendations:
-                break
+        # Blend the recently viewed products in one batch call: each product is
+        # scored by its best similarity to any of them, without duplicates
+        recommendations = recommender.get_recommendations_batch(recent_products, n=num_recommendations, merge='max')
     
     # If we don't have enough recommendations yet (or no viewed products),
     # add some top-rated products
     if len(recommendations) < num_recommendations:
-        top_rated = df.sort_values(by='Rating', ascending=False).head(num_recommendations).reset_index(drop=True)
+        top_rated = df.take(facets.top(num_recommendations)).reset_index(drop=True)
         for i in range(min(len(top_rated), num_recommendations - len(recommendations))):
             product = top_rated.iloc[i]
             # Only add if not already in recommendations
@@ -486,6 +484,9 @@ with main_content:
             # Create a 3-column layout for recommendations
             rec_cols = st.columns(3)
             
+            # Thumbnails of all six recommendations (missing ones are downloaded in parallel)
+            rec_images = thumbnails.urls([product['image_url'] for product in personal_recommendations[:6]], 140)
+            
             # Display each recommendation
             for i, product in enumerate(personal_recommendations[:6]):
                 with rec_cols[i % 3]:
@@ -495,7 +496,7 @@ with main_content:
                                 box-shadow: 0 4px 8px rgba(0,0,0,0.05); transition: transform 0.2s;">
                         <div style="height: 160px; display: flex; align-items: center; justify-content: center; 
                                     background-color: #f9f9f9; padding: 1rem; overflow: hidden;">
-                            <img src="{product['image_url']}" style="max-height: 140px; max-width: 100%; object-fit: contain;">
+                            <img src="{rec_images[i]}" style="max-height: 140px; max-width: 100%; object-fit: contain;">
                         </div>
                         <div style="padding: 1rem;">
                             <h4 style="color: #3C5067; font-family: 'Playfair Display', serif; margin-bottom: 0.5rem; 
@@ -945,59 +946,30 @@ sort_by = st.sidebar.radio(
 
 # No need for sidebar recommendations selector
 
-# Filter products
-filtered_data = df.copy()
+# Which model the recommendations come from (updated in the background)
+model_status = recommender.status()
+st.sidebar.caption(f"Model v{model_status['version']}, updated {model_status['age_seconds']:.0f}s ago"
+                   + (" (update in progress)" if model_status['updating'] else ""))
 
+# Filter and sort products: position arrays per facet and presorted orders,
+# memoized per filter combination, so a rerun neither copies, scans nor sorts the full table
+# (only the page of the grid on screen is materialized, see "All Products" below)
+filtered_positions, related_categories = facets.select(selected_category, selected_country,
+                                                       min_rating if filter_by_rating else 0.0, sort_by)
 
-# Apply filters to the data with better handling for special categories
 if selected_category != 'All':
-    # First try direct exact match filtering
-    category_filter = filtered_data['Category'] == selected_category
-    exact_match_data = filtered_data[category_filter]
-    
-    # If no exact matches, try partial/contains matching for special categories
-    if len(exact_match_data) == 0 and selected_category in ['Luxury Jewelry', 'Body care', 'Face care', 'Hair care', 'Make up']:
-        # Try a more flexible match - contains or similar categories
-        if selected_category == 'Luxury Jewelry':
-            # Look for jewelry, accessories or luxury items
-            category_filter = filtered_data['Category'].str.contains('Jewelry|Accessories|Luxury', case=False)
-        elif 'care' in selected_category.lower():
-            # For care products, match anything with 'care' in it
-            search_term = selected_category.split()[0].lower() # 'Body', 'Face', 'Hair'
-            category_filter = filtered_data['Category'].str.contains(search_term, case=False)
-        elif selected_category == 'Make up':
-            # For makeup products
-            category_filter = filtered_data['Category'].str.contains('Make|Cosmetic|Beauty', case=False)
-            
-        filtered_data = filtered_data[category_filter]
-        if len(filtered_data) > 0:
-            st.info(f"Showing related products for '{selected_category}'")
-    else:
-        # Use the exact matches if available
-        filtered_data = exact_match_data
+    # Categories without products of their own fall back to related categories
+    category_positions, _ = facets.category_positions(selected_category)
+    if related_categories and len(category_positions) > 0:
+        st.info(f"Showing related products for '{selected_category}'")
     
     # Debug info
-    print(f"Filtered to {len(filtered_data)} products in category '{selected_category}'")
+    print(f"Filtered to {len(category_positions)} products in category '{selected_category}'")
     
     # If still no products found, show a warning
-    if len(filtered_data) == 0:
+    if len(category_positions) == 0:
         st.warning(f"No products found in the '{selected_category}' category.")
         print(f"No products found in category: {selected_category}")
-        print("Available categories:")
-        print(df['Category'].value_counts())
-
-if selected_country != 'All':
-    filtered_data = filtered_data[filtered_data['Country'] == selected_country]
-if filter_by_rating:
-    filtered_data = filtered_data[filtered_data['Rating'] >= min_rating]
-
-# Sort data
-if sort_by == "Rating (High to Low)":
-    filtered_data = filtered_data.sort_values('Rating', ascending=False)
-elif sort_by == "Price (Low to High)":
-    filtered_data = filtered_data.sort_values('Sales', ascending=True)
-else:
-    filtered_data = filtered_data.sort_values('Sales', ascending=False)
 
 # Display products in a grid
 filter_text = ""
@@ -1028,23 +1000,14 @@ def get_personalized_recommendations(num_recommendations=6):
         # Use the three most recently viewed products for recommendations
         recent_products = st.session_state['viewed_products'][:3]
         
-        # Get recommendations for each recently viewed product
-        for product_name in recent_products:
-            similar_products = recommender.get_recommendations(product_name, n=3)
-            if similar_products:
-                for product in similar_products:
-                    # Check if this product is already in our recommendations
-                    if not any(rec['name'] == product['name'] for rec in recommendations):
-                        recommendations.append(product)
-                        if len(recommendations) >= num_recommendations:
-                            break
-            if len(recommendations) >= num_recommendations:
-                break
+        # Blend the recently viewed products in one batch call: each product is
+        # scored by its best similarity to any of them, without duplicates
+        recommendations = recommender.get_recommendations_batch(recent_products, n=num_recommendations, merge='max')
     
     # If we don't have enough recommendations yet (or no viewed products),
     # add some top-rated products
     if len(recommendations) < num_recommendations:
-        top_rated = df.sort_values(by='Rating', ascending=False).head(num_recommendations).reset_index(drop=True)
+        top_rated = df.take(facets.top(num_recommendations)).reset_index(drop=True)
         for i in range(min(len(top_rated), num_recommendations - len(recommendations))):
             product = top_rated.iloc[i]
             # Only add if not already in recommendations
@@ -1094,7 +1057,7 @@ def display_product_row(products, start_idx, section_id='normal', count=3):
                 
                 # Product image
                 if pd.notna(product.get('Product Image URL', None)):
-                    st.image(product['Product Image URL'], width=130)
+                    st.image(thumbnail_image(product['Product Image URL'], 130), width=130)
                 else:
                     st.image("https://via.placeholder.com/140x140?text=No+Image", width=130)
                 
@@ -1148,37 +1111,8 @@ def display_similar_products():
             </div>
             """, unsafe_allow_html=True)
             
-            # Create columns for similar products
-            cols = st.columns(3)
-            
-            # Display each similar product
-            for i, product in enumerate(similar_products[:min(6, len(similar_products))]):
-                col_idx = i % 3
-                with cols[col_idx]:
-                    # Get similarity score as percentage
-                    similarity = int(product['similarity'] * 100)
-                    
-                    # Create a product card
-                    st.markdown(f'''
-                    <div style="background-color: white; border-radius: 8px; padding: 15px; margin-bottom: 15px; 
-                                border: 1px solid rgba(74, 101, 130, 0.3); box-shadow: 0 2px 6px rgba(0,0,0,0.05);">
-                        <div style="text-align: center; margin-bottom: 10px;">
-                            <img src="{product['image_url']}" style="max-width: 120px; max-height: 120px; object-fit: contain;">
-                        </div>
-                        <h4 style="margin: 10px 0; min-height: 2.5em; color: var(--slate-blue);">{product['name']}</h4>
-                        <div style="display: flex; justify-content: space-between; align-items: center;">
-                            <span style="font-weight: bold; color: var(--terracotta); font-size: 1.1em;">${product['price']:.2f}</span>
-                            <span style="background-color: rgba(195, 106, 45, 0.1); color: var(--terracotta); 
-                                     padding: 3px 8px; border-radius: 12px; font-size: 0.85em;">
-                                {similarity}% match
-                            </span>
-                        </div>
-                        <div style="margin-top: 8px;">
-                            <span style="color: #FFA41C;">{'★' * int(product['rating'])}{'☆' * (5-int(product['rating']))}</span>
-                        </div>
-                        <div style="font-size: 0.9em; color: #555; margin-top: 5px;">{product['category']}</div>
-                    </div>
-                    ''', unsafe_allow_html=True)
+            # All similar products as one block of cards
+            st.markdown(recommendation_cards(similar_products[:6], image_width=120, thumbnails=thumbnails), unsafe_allow_html=True)
             
             # Add a button to clear selection
             if st.button("❌ Clear Selection", key="clear_selection"):
@@ -1188,7 +1122,7 @@ def display_similar_products():
             st.info(f"No similar products found for {selected_product}")
 
 # All remaining dashboard content continues below
-if len(filtered_data) > 0:
+if len(filtered_positions) > 0:
     # Show the top rated products section first
     st.markdown("""
     <div style="margin-bottom: 2rem; position: relative; padding-bottom: 0.8rem;">
@@ -1201,7 +1135,9 @@ if len(filtered_data) > 0:
     """, unsafe_allow_html=True)
     
     # Get top 3 highest rated products from entire dataset
-    top_rated = df.sort_values(by='Rating', ascending=False).head(3).reset_index(drop=True)
+    top_rated = df.take(facets.top(3)).reset_index(drop=True)
+    # Download any missing thumbnails of the three in parallel
+    thumbnails.urls(top_rated['Product Image URL'], 200)
     
     # Create columns for top rated products
     top_cols = st.columns(3)
@@ -1230,7 +1166,7 @@ if len(filtered_data) > 0:
             
             # Display the product image if available
             if pd.notna(product.get('Product Image URL', None)):
-                st.image(product['Product Image URL'], width=200)
+                st.image(thumbnail_image(product['Product Image URL'], 200), width=200)
             else:
                 # Use a styled placeholder with the category name
                 st.markdown(f"""
@@ -1269,54 +1205,50 @@ if len(filtered_data) > 0:
     else:
         st.subheader("All Products")
     
-    # Calculate number of rows needed
+    # Paginated grid: only the products on the current page (or, with infinite
+    # scroll, the pages loaded so far) are materialized and rendered
     products_per_row = 3
-    num_products = len(filtered_data)
-    num_rows = (num_products + products_per_row - 1) // products_per_row
-            
+    num_products = len(filtered_positions)
+    page_size_col, scroll_col = st.columns([1, 1])
+    with page_size_col:
+        page_size = st.selectbox("Products per page", PAGE_SIZES,
+                                 index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key="grid_page_size")
+    with scroll_col:
+        infinite_scroll = st.checkbox("Infinite scroll", key="grid_infinite_scroll")
+    num_pages = page_count(num_products, page_size)
+    page = current_page(st.session_state,
+                        (selected_category, selected_country, min_rating if filter_by_rating else 0.0,
+                         sort_by, page_size, infinite_scroll),
+                        num_products, page_size)
+    page_start, page_end = page_bounds(num_products, page_size, page, infinite_scroll)
+    page_data = df.take(filtered_positions[page_start:page_end])
+
+    def change_page(step):
+        st.session_state[PAGE_KEY] = st.session_state.get(PAGE_KEY, 0) + step
+
     # Check if we have any products to display after filtering
-    if len(filtered_data) > 0:
-        # Process each row of regular products
-        for row in range(num_rows):
-            # Create columns for this row
-            cols = st.columns(products_per_row)
-            
-            # Fill the columns with products
-            for col in range(products_per_row):
-                # Calculate the product index
-                idx = row * products_per_row + col
-                
-                # Check if we still have products to display
-                if idx < num_products:
-                    product = filtered_data.iloc[idx]
-                    
-                    # Display product in this column
-                    with cols[col]:
-                        # Create a clean card-like container with CSS
-                        st.markdown('<div style="background-color: white; border-radius: 18px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); padding: 15px; height: 100%">', unsafe_allow_html=True)
-                        
-                        # Product image
-                        if pd.notna(product['Product Image URL']):
-                            st.image(product['Product Image URL'], width=130)
-                        else:
-                            st.image("https://via.placeholder.com/140x140?text=No+Image", width=130)
-                        
-                        # Product details
-                        st.markdown(f"**{product['Product']}**")
-                        st.markdown(f"<span style='color: #B12704; font-weight: bold; font-size: 18px;'>${product['Sales']:.2f}</span>", unsafe_allow_html=True)
-                        st.markdown(f"<span style='color: #565959; font-size: 14px;'>{product['Category']} | {product['Country']}</span>", unsafe_allow_html=True)
-                        
-                        # Rating as stars
-                        rating = int(product["Rating"])
-                        st.markdown(f"<span style='color: #FFA41C;'>{'★' * rating}{'☆' * (5-rating)}</span>", unsafe_allow_html=True)
-                        
-                        # Close the card container
-                        st.markdown('</div>', unsafe_allow_html=True)
-                # Close the column
-                st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Close the row
-        st.markdown('</div>', unsafe_allow_html=True)
+    if num_products > 0:
+        # The whole page of cards as one HTML block (one element instead of ~7 per product)
+        st.markdown(product_cards(page_data, recommender.schema, columns=products_per_row, thumbnails=thumbnails), unsafe_allow_html=True)
+
+        # Page navigation
+        if infinite_scroll:
+            st.caption(f"Showing {page_end} of {num_products} products")
+            if page_end < num_products:
+                st.button("Load more", key="grid_load_more", on_click=change_page, args=(1,),
+                          use_container_width=True)
+        else:
+            prev_col, info_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                st.button("← Previous", key="grid_prev_page", on_click=change_page, args=(-1,),
+                          disabled=page == 0, use_container_width=True)
+            with info_col:
+                st.markdown(f"<div style='text-align: center;'>Page {page + 1} of {num_pages} "
+                            f"({page_start + 1}–{page_end} of {num_products} products)</div>",
+                            unsafe_allow_html=True)
+            with next_col:
+                st.button("Next →", key="grid_next_page", on_click=change_page, args=(1,),
+                          disabled=page >= num_pages - 1, use_container_width=True)
     else:
         # Display message if no products match the filters
         st.info("No products match your selected filters. Try adjusting your filters to see more products.")
@@ -1334,54 +1266,13 @@ if len(filtered_data) > 0:
         similar_products = recommender.get_recommendations(st.session_state['selected_product'], n=4)
         
         if similar_products:
-            # Create a container with styling
-            st.markdown('<div style="background-color: #f8f1e5; padding: 20px; border-radius: 18px; margin: 20px 0; border-left: 4px solid #F39C12;">', unsafe_allow_html=True)
-            
-            # Create columns for the similar products
-            cols = st.columns(len(similar_products))
-            
-            # Display each product in its column
-            for i, (col, product) in enumerate(zip(cols, similar_products)):
-                with col:
-                    # Get category-specific colors
-                    category = product.get('category', 'Uncategorized')
-                    colors = category_colors.get(category, {'primary': '#fff8ec', 'secondary': '#f8f1e5', 'accent': '#F39C12'})
-                    
-                    # Create a clean card container with category-specific styling
-                    primary_color = colors['primary']
-                    accent_color = colors['accent']
-                    st.markdown(f'<div style="background-color: {primary_color}; border-radius: 18px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); padding: 15px; height: 100%; border-left: 4px solid {accent_color};">', unsafe_allow_html=True)
-                    
-                    # Product image
-                    if pd.notna(product.get('image_url', None)):
-                        st.image(product['image_url'], width=120)
-                    else:
-                        st.image("https://via.placeholder.com/120x120?text=No+Image", width=120)
-                    
-                    # Product details
-                    st.markdown(f"<div style='font-weight: bold; font-size: 16px;'>{product['name']}</div>", unsafe_allow_html=True)
-                    st.markdown(f"<div style='color: #B12704; font-weight: bold;'>${product.get('price', '0.00')}</div>", unsafe_allow_html=True)
-                    
-                    # Close container
-                    st.markdown("</div>", unsafe_allow_html=True)
-                    
-                    # Rating stars
-                    rating = int(product["rating"])
-                    st.markdown(f"<span style='color: #FFA41C;'>{'★' * rating}{'☆' * (5-rating)}</span>", unsafe_allow_html=True)
-                    
-                    # Category with custom styling
-                    accent_color = colors['accent']
-                    st.markdown(f"<span style='color: {accent_color}; font-size: 14px;'>{product['category']}</span>", unsafe_allow_html=True)
-                    
-                    # Similarity score inside the card (properly indented and formatted)
-                    accent_color = colors['accent']
-                    st.markdown(f"<span style='color: {accent_color}; font-weight: bold;'>Similarity: {product['similarity']:.2f}</span>", unsafe_allow_html=True)
-                
-                # Close the card container
-                st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Close the recommendation section
-        st.markdown('</div>', unsafe_allow_html=True)
+            # The styled container and its cards as one block
+            st.markdown('<div style="background-color: #f8f1e5; padding: 20px; border-radius: 18px; margin: 20px 0; border-left: 4px solid #F39C12;">'
+                        + recommendation_cards(similar_products, image_width=120, columns=len(similar_products),
+                                               thumbnails=thumbnails,
+                                               category_accents={category: colors['accent']
+                                                                 for category, colors in category_colors.items()})
+                        + '</div>', unsafe_allow_html=True)
     else:
         st.info("No similar products found.")
 
@@ -0,0 +1,76 @@
+"""
+Shared, vectorized clean-up of the product dataset.
+
+Used by the recommender, the dashboard and the simplified dashboard so every
+entry point fills missing values and placeholder images the same way. All
+operations work on whole columns (no iterrows).
+"""
+import pandas as pd
+from typing import Optional
+
+# Import column schema - handle both module import approaches
+try:
+    from schema import DatasetSchema, resolve_schema
+except ModuleNotFoundError:
+    from src.schema import DatasetSchema, resolve_schema
+
+PLACEHOLDER_IMAGE_URL = "https://via.placeholder.com/140x140?text="
+
+# Values used for missing entries, per schema role
+FILL_VALUES = {
+    'name': 'Unnamed Product',
+    'category': 'Uncategorized',
+    'country': 'Unknown',
+    'price': 0,
+    'rating': 0,
+}
+
+
+def fill_placeholder_images(df: pd.DataFrame, image_col: str = 'Product Image URL',
+                            category_col: Optional[str] = 'Category') -> int:
+    """Replace missing or blank image URLs with a category placeholder, in place.
+
+    Returns the number of URLs that were filled.
+    """
+    if image_col not in df.columns:
+        df[image_col] = pd.NA
+    urls = df[image_col]
+    missing = urls.isna() | (urls.astype(str).str.strip() == '')
+    if not missing.any():
+        return 0
+
+    if category_col in df.columns:
+        labels = df.loc[missing, category_col].fillna('Product').astype(str)
+    else:
+        labels = pd.Series('Product', index=df.index[missing])
+    if not pd.api.types.is_string_dtype(df[image_col]):
+        # e.g. an all-NaN float column: make room for the URL strings
+        df[image_col] = df[image_col].astype(object)
+    df.loc[missing, image_col] = PLACEHOLDER_IMAGE_URL + labels.str.replace(' ', '+', regex=False)
+    return int(missing.sum())
+
+
+def normalize_dataset(df: pd.DataFrame, schema: Optional[DatasetSchema] = None) -> pd.DataFrame:
+    """Fill missing values and placeholder images in place and return the DataFrame.
+
+    Missing names, categories and countries get a readable default, missing
+    prices and ratings become 0. A missing Country column is added as 'Global'.
+    """
+    if schema is None:
+        schema = resolve_schema(df.columns)
+
+    for role, value in FILL_VALUES.items():
+        column = getattr(schema, role)
+        if column is None:
+            continue
+        if role in ('price', 'rating'):
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(value)
+        else:
+            df[column] = df[column].fillna(value)
+
+    if schema.country is None:
+        df['Country'] = 'Global'
+        print("Note: Country column was missing and has been added with default value 'Global'")
+
+    fill_placeholder_images(df, schema.image or 'Product Image URL', schema.category)
+    return df
@@ -0,0 +1,189 @@
+"""
+Facet index for the dashboard's category / country / rating filters.
+
+Filtering the product table on every Streamlit rerun copies and scans the
+whole frame. The facet index is built once per table instead: every
+category and country maps to the sorted row positions holding it, and the
+rows are also kept in rating order. A filter is then an intersection of the
+(small) position arrays of the selected facets plus a rating check on the
+survivors, and the result of every filter combination is memoized.
+
+The dashboard's sort modes are precomputed as permutations of the table, so
+a sorted view is the presorted order restricted to the selected rows rather
+than a new sort.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Import schema - handle both module import approaches
+try:
+    from schema import DatasetSchema, resolve_schema
+except ModuleNotFoundError:
+    from src.schema import DatasetSchema, resolve_schema
+
+ALL = 'All'
+# Filter results kept per index (category x country x rating combinations)
+DEFAULT_CACHE_SIZE = 256
+# Related categories shown when a selected category has no products of its own
+RELATED_CATEGORY_PATTERNS = {
+    'Luxury Jewelry': 'Jewelry|Accessories|Luxury',
+    'Body care': 'body',
+    'Face care': 'face',
+    'Hair care': 'hair',
+    'Make up': 'Make|Cosmetic|Beauty',
+}
+
+RATING_HIGH_TO_LOW = "Rating (High to Low)"
+PRICE_LOW_TO_HIGH = "Price (Low to High)"
+PRICE_HIGH_TO_LOW = "Price (High to Low)"
+# Sort mode -> (schema role, descending)
+SORT_ORDERS = {
+    RATING_HIGH_TO_LOW: ('rating', True),
+    PRICE_LOW_TO_HIGH: ('price', False),
+    PRICE_HIGH_TO_LOW: ('price', True),
+}
+# Selections smaller than 1/SMALL_SELECTION of the table are sorted by rank instead of masking the order
+SMALL_SELECTION = 16
+
+EMPTY = np.empty(0, dtype=np.int64)
+EMPTY.flags.writeable = False
+
+
+def group_positions(values: pd.Series) -> Dict:
+    """Value -> sorted row positions holding it (missing values are left out)."""
+    groups = pd.Series(np.arange(len(values))).groupby(values.to_numpy()).indices
+    for positions in groups.values():
+        positions.flags.writeable = False
+    return groups
+
+
+def sort_permutation(values: np.ndarray, descending: bool) -> np.ndarray:
+    """Stable sort order of `values` with missing values last, as sort_values places them."""
+    order = np.argsort(-values if descending else values, kind='stable')
+    order.flags.writeable = False
+    return order
+
+
+def intersect_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Intersection of two sorted, duplicate-free position arrays (O(len(a) log len(b)))."""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return EMPTY
+    found = np.minimum(np.searchsorted(b, a), len(b) - 1)
+    return a[b[found] == a]
+
+
+class FacetIndex:
+    """Row positions per category and country, plus presorted orders, for one product table."""
+
+    def __init__(self, data: pd.DataFrame, schema: Optional[DatasetSchema] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        if schema is None:
+            schema = resolve_schema(data.columns)
+        self.n_rows = len(data)
+        self.category_rows = group_positions(data[schema.category]) if schema.category else {}
+        self.country_rows = group_positions(data[schema.country]) if schema.country else {}
+        if schema.rating:
+            self.ratings = data[schema.rating].to_numpy(dtype=float)
+        else:
+            self.ratings = np.full(self.n_rows, np.nan)
+        # Rows by ascending rating; missing ratings sort last and never pass a rating filter
+        self._rating_order = np.argsort(self.ratings, kind='stable')
+        self._sorted_ratings = self.ratings[self._rating_order]
+        self._rated_count = int(np.count_nonzero(~np.isnan(self.ratings)))
+
+        # Every sort mode as a permutation of the table, plus each row's rank in it
+        columns = {'rating': schema.rating, 'price': schema.price}
+        self.orders = {}
+        self._ranks = {}
+        for sort_by, (role, descending) in SORT_ORDERS.items():
+            if columns[role] is None:
+                continue
+            order = sort_permutation(data[columns[role]].to_numpy(dtype=float), descending)
+            rank = np.empty(self.n_rows, dtype=np.int64)
+            rank[order] = np.arange(self.n_rows)
+            self.orders[sort_by], self._ranks[sort_by] = order, rank
+        self.select = lru_cache(maxsize=cache_size)(self._select)
+
+    def top(self, n: int, sort_by: str = RATING_HIGH_TO_LOW) -> np.ndarray:
+        """Positions of the first n rows of the table in a sort mode (e.g. the top rated)."""
+        return self._order(sort_by)[:n]
+
+    def _order(self, sort_by: str) -> np.ndarray:
+        if sort_by not in SORT_ORDERS:
+            raise ValueError(f"sort_by must be one of {list(SORT_ORDERS)}")
+        order = self.orders.get(sort_by)
+        return order if order is not None else np.arange(self.n_rows)
+
+    def sort_positions(self, positions: np.ndarray, sort_by: str) -> np.ndarray:
+        """Row positions reordered by a sort mode, using the presorted order."""
+        order = self._order(sort_by)
+        if len(positions) == self.n_rows:
+            return order
+        if len(positions) * SMALL_SELECTION < self.n_rows and sort_by in self._ranks:
+            # Few rows: sorting their ranks is cheaper than scanning the whole order
+            return positions[np.argsort(self._ranks[sort_by][positions], kind='stable')]
+        selected = np.zeros(self.n_rows, dtype=bool)
+        selected[positions] = True
+        return order[selected[order]]
+
+    def category_positions(self, category) -> Tuple[np.ndarray, bool]:
+        """Rows of a category and whether they come from related categories.
+
+        When the category has no rows of its own, categories whose name
+        matches its RELATED_CATEGORY_PATTERNS entry are used instead.
+        """
+        rows = self.category_rows.get(category)
+        if rows is not None and len(rows):
+            return rows, False
+        pattern = RELATED_CATEGORY_PATTERNS.get(category)
+        if pattern is None:
+            return EMPTY, False
+        related = [rows for name, rows in self.category_rows.items()
+                   if re.search(pattern, str(name), re.IGNORECASE)]
+        if not related:
+            return EMPTY, True
+        return np.sort(np.concatenate(related)), True
+
+    def rated_at_least(self, min_rating: float) -> np.ndarray:
+        """Sorted rows rated min_rating or higher."""
+        start = np.searchsorted(self._sorted_ratings[:self._rated_count], min_rating, side='left')
+        return np.sort(self._rating_order[start:self._rated_count])
+
+    def _select(self, category=ALL, country=ALL, min_rating: float = 0.0,
+                sort_by: Optional[str] = None) -> Tuple[np.ndarray, bool]:
+        """Row positions matching the filters and whether related categories were used.
+
+        'All' disables the category or country filter and a min_rating of 0
+        the rating filter. Positions are in table order, or in the order of
+        `sort_by` (one of SORT_ORDERS). Results are memoized per (category,
+        country, min_rating, sort_by) and returned read-only.
+        """
+        facets = []
+        related = False
+        if category != ALL:
+            rows, related = self.category_positions(category)
+            facets.append(rows)
+        if country != ALL:
+            facets.append(self.country_rows.get(country, EMPTY))
+
+        if not facets:
+            positions = self.rated_at_least(min_rating) if min_rating > 0 else np.arange(self.n_rows)
+        else:
+            # Intersect the smallest sets first, then check ratings on the survivors only
+            facets.sort(key=len)
+            positions = facets[0]
+            for rows in facets[1:]:
+                positions = intersect_sorted(positions, rows)
+            if min_rating > 0:
+                positions = positions[self.ratings[positions] >= min_rating]
+        if sort_by is not None:
+            positions = self.sort_positions(positions, sort_by)
+        if positions.flags.writeable:
+            positions.flags.writeable = False
+        return positions, related
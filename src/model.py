@@ -0,0 +1,118 @@
+"""
+Immutable snapshot of everything the recommender serves reads from.
+
+One ProductRecommender is shared by every dashboard session. Readers take
+the current RecommenderModel once per call and only use that; writers
+(new ratings, rebuilds, a new table) work on their own arrays and publish a
+new model by replacing a single attribute, which is atomic in CPython. A
+reader therefore always sees one consistent table and neighbor index, never
+a half-built or half-patched one, and never waits for a writer.
+
+Published arrays are marked read-only, so a writer that wants to patch one
+has to copy it first (copy-on-write).
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Import model parts - handle both module import approaches
+try:
+    from schema import DatasetSchema
+    from ann_index import IVFIndex
+    from collaborative import similarity_rows
+except ModuleNotFoundError:
+    from src.schema import DatasetSchema
+    from src.ann_index import IVFIndex
+    from src.collaborative import similarity_rows
+
+
+def freeze(array):
+    """Mark a NumPy array read-only (in place) and return it."""
+    if isinstance(array, np.ndarray):
+        array.flags.writeable = False
+    return array
+
+
+def lookup_product_rows(rows_by_product_id: Dict, n_rows: int, product_id) -> Optional[np.ndarray]:
+    """Row positions a product ID appears in, or None if it is unknown."""
+    try:
+        rows = rows_by_product_id.get(product_id)
+    except TypeError:  # Unhashable input
+        return None
+    # Fall back to row positions (as returned by get_product_id_by_name)
+    if rows is None and isinstance(product_id, (int, np.integer)) and 0 <= product_id < n_rows:
+        rows = np.array([product_id])
+    return rows
+
+
+def product_keys(frame: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """(Product ID, name) catalog key of every row, as a 1-D object array of tuples.
+
+    `columns` are the key columns the table has (see catalog.py: the same
+    Product ID is sometimes used for differently named products).
+    """
+    if not columns:
+        return np.empty(len(frame), dtype=object)
+    return pd.MultiIndex.from_frame(frame[columns]).to_numpy()
+
+
+def group_rows(keys: np.ndarray) -> Dict:
+    """Key -> all row positions with that key."""
+    codes, uniques = pd.factorize(keys)
+    return {uniques[code]: rows for code, rows in pd.Series(np.arange(len(keys))).groupby(codes).indices.items()}
+
+
+@dataclass(frozen=True)
+class RecommenderModel:
+    """Product table, lookups and neighbor index published together."""
+    data: Optional[pd.DataFrame] = None
+    schema: DatasetSchema = field(default_factory=DatasetSchema)
+    row_by_name: Dict = field(default_factory=dict)          # Product name -> first row position
+    rows_by_product_key: Dict = field(default_factory=dict)  # (Product ID, name) -> all row positions
+    neighbor_indices: Optional[np.ndarray] = None            # (N, K) row positions of the most similar products
+    neighbor_scores: Optional[np.ndarray] = None             # (N, K) similarity of those products
+    unit_features: Optional[np.ndarray] = None               # Row-normalized content features
+    item_users: Optional[sparse.csr_matrix] = None           # Collaborative backend: unit (items x users)
+    ann_index: Optional[IVFIndex] = None
+    version: int = 0
+    built_at: float = field(default_factory=time.time)       # Unix time the model was published
+
+    def __post_init__(self):
+        for array in (self.neighbor_indices, self.neighbor_scores, self.unit_features):
+            freeze(array)
+
+    @property
+    def empty(self) -> bool:
+        return self.data is None or self.data.empty
+
+    @property
+    def age(self) -> float:
+        """Seconds since the model was published."""
+        return time.time() - self.built_at
+
+    def row_of(self, product_name) -> Optional[int]:
+        """Row position of a product name, or None if it is not in the table."""
+        try:
+            return self.row_by_name.get(product_name)
+        except TypeError:  # Unhashable input
+            return None
+
+    def rows_for_product_key(self, product_key) -> Optional[np.ndarray]:
+        """Row positions of a (Product ID, name) catalog key, or None if it is unknown."""
+        try:
+            return self.rows_by_product_key.get(product_key)
+        except TypeError:  # Unhashable input
+            return None
+
+    def similarity_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Dense similarity of `rows` against every product, -inf for the product itself."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.item_users is not None:
+            return similarity_rows(self.item_users, rows)
+        block = self.unit_features[rows] @ self.unit_features.T
+        block[np.arange(len(rows)), rows] = -np.inf
+        return block
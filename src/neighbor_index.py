@@ -0,0 +1,175 @@
+"""
+Top-K nearest neighbor index for product feature vectors.
+
+Instead of keeping a dense N x N cosine similarity matrix in memory, we only
+keep the K most similar products for every product. The index is built in
+row blocks so the peak memory is block_size x N floats instead of N x N.
+"""
+import numpy as np
+from typing import Tuple
+
+DEFAULT_TOP_K = 50
+DEFAULT_BLOCK_SIZE = 256
+
+
+def normalize_rows(features: np.ndarray) -> np.ndarray:
+    """Scale every row to unit length so a dot product equals cosine similarity."""
+    features = np.asarray(features, dtype=np.float32)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    # Rows without any signal stay all-zero (cosine similarity of 0 with everything)
+    norms[norms == 0] = 1.0
+    return features / norms
+
+
+def build_topk_index(features: np.ndarray, k: int = DEFAULT_TOP_K,
+                     block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Build the top-K cosine neighbor lists for every row of the feature matrix.
+
+    Returns (indices, scores), both of shape (N, K), sorted by descending score.
+    A product is never listed as its own neighbor.
+    """
+    unit = normalize_rows(features)
+    n_rows = unit.shape[0]
+    k = max(0, min(k, n_rows - 1))
+
+    indices = np.empty((n_rows, k), dtype=np.int32)
+    scores = np.empty((n_rows, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    for start in range(0, n_rows, block_size):
+        stop = min(start + block_size, n_rows)
+        block = unit[start:stop] @ unit.T
+
+        # Exclude each product from its own neighbor list
+        rows = np.arange(stop - start)
+        block[rows, rows + start] = -np.inf
+
+        indices[start:stop], scores[start:stop] = select_topk(block, k)
+
+    return indices, scores
+
+
+def build_partitioned_topk_index(features: np.ndarray, groups: np.ndarray, shared_columns: int,
+                                 k: int = DEFAULT_TOP_K, block_size: int = DEFAULT_BLOCK_SIZE
+                                 ) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact top-K lists computed within partitions (e.g. categories) where possible.
+
+    The first `shared_columns` features are shared by all rows; the rest is a
+    one-hot encoding of `groups`, so rows in different groups only overlap
+    on the shared columns. Every row is first scored against its own group
+    only. A cross-group score can be at most
+    |row's shared part| x max |other group's shared part| (unit vectors),
+    and only rows whose K-th score is below that bound (or whose group has
+    fewer than K other rows) are rescored against the whole catalog. Work is
+    about sum(group size^2) instead of N^2, with the same result as
+    build_topk_index (up to the order of equal scores).
+    """
+    unit = normalize_rows(features)
+    n_rows = unit.shape[0]
+    k = max(0, min(k, n_rows - 1))
+    indices = np.empty((n_rows, k), dtype=np.int32)
+    scores = np.empty((n_rows, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    _, codes = np.unique(np.asarray(groups, dtype=str), return_inverse=True)
+    n_groups = codes.max() + 1
+    shared_norm = np.linalg.norm(unit[:, :shared_columns], axis=1)
+    # Largest shared part outside each group: the best and second best group maxima
+    group_max = np.zeros(n_groups, dtype=np.float32)
+    np.maximum.at(group_max, codes, shared_norm)
+    order = np.argsort(-group_max)
+    other_max = np.full(n_groups, group_max[order[0]], dtype=np.float32)
+    other_max[order[0]] = group_max[order[1]] if n_groups > 1 else 0.0
+
+    rescore = []
+    for group in range(n_groups):
+        members = np.flatnonzero(codes == group)
+        if len(members) - 1 < k:
+            rescore.append(members)
+            continue
+        member_unit = unit[members]
+        for start in range(0, len(members), block_size):
+            chunk = members[start:start + block_size]
+            block = member_unit[start:start + block_size] @ member_unit.T
+            rows = np.arange(len(chunk))
+            block[rows, rows + start] = -np.inf
+            top, top_scores = select_topk(block, k)
+            indices[chunk], scores[chunk] = members[top], top_scores
+            # Rows where some product of another group might still make the list
+            bound = shared_norm[chunk] * other_max[group]
+            rescore.append(chunk[top_scores[:, -1] < bound])
+
+    rescore = np.concatenate(rescore) if rescore else np.empty(0, dtype=np.int64)
+    for start in range(0, len(rescore), block_size):
+        chunk = rescore[start:start + block_size]
+        block = unit[chunk] @ unit.T
+        block[np.arange(len(chunk)), chunk] = -np.inf
+        indices[chunk], scores[chunk] = select_topk(block, k)
+    return indices, scores
+
+
+def refresh_topk_rows(unit: np.ndarray, indices: np.ndarray, scores: np.ndarray, rows: np.ndarray,
+                      block_size: int = DEFAULT_BLOCK_SIZE):
+    """Update the neighbor lists in place after the feature rows in `rows` changed.
+
+    `unit` must already hold the new normalized rows. Rows that list a changed
+    product get its new score, rows where it now beats the K-th neighbor pick it
+    up, and rows where its score dropped (so a replacement may be needed) are
+    rescored exactly together with the changed rows. Since every product is on
+    about K lists, this is O(N * K) work per changed row instead of O(N^2).
+    """
+    k = indices.shape[1]
+    rows = np.asarray(rows, dtype=np.int64)
+    if k == 0 or len(rows) == 0:
+        return
+
+    sims = unit @ unit[rows].T  # (N, len(rows))
+    rescore = [rows]
+
+    for j, row in enumerate(rows):
+        column = sims[:, j].copy()
+        column[row] = -np.inf
+
+        # Rows already listing the changed product: refresh its score
+        hit = indices == row
+        listed = hit.any(axis=1)
+        hit_rows = np.nonzero(hit)[0]
+        dropped = column[hit_rows] < scores[hit]
+        scores[hit] = column[hit_rows]
+        rescore.append(hit_rows[dropped])
+
+        # Rows where the changed product now beats the current K-th neighbor
+        joins = ~listed & (column > scores[:, -1])
+        indices[joins, -1] = row
+        scores[joins, -1] = column[joins]
+
+        # Restore descending order in the touched rows only
+        touched = np.flatnonzero(listed | joins)
+        order = np.argsort(-scores[touched], axis=1, kind='stable')
+        indices[touched] = np.take_along_axis(indices[touched], order, axis=1)
+        scores[touched] = np.take_along_axis(scores[touched], order, axis=1)
+
+    # Exact neighbor lists for the changed rows and rows that lost score
+    rescore = np.unique(np.concatenate(rescore))
+    for start in range(0, len(rescore), block_size):
+        chunk = rescore[start:start + block_size]
+        block = unit[chunk] @ unit.T
+        block[np.arange(len(chunk)), chunk] = -np.inf
+        indices[chunk], scores[chunk] = select_topk(block, k)
+
+
+def select_topk(block: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the K best (indices, scores) of every row of `block`, best first.
+
+    Uses argpartition so only the K selected candidates are sorted.
+    """
+    k = min(k, block.shape[1])
+    # Select the K best candidates without sorting the whole row
+    top = np.argpartition(block, -k, axis=1)[:, -k:]
+    top_scores = np.take_along_axis(block, top, axis=1)
+
+    # Sort only the K selected candidates
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
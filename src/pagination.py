@@ -0,0 +1,44 @@
+"""
+Paging for the dashboard's product grid.
+
+The grid only materializes the products that are on screen: a page of
+`page_size` products, or with infinite scroll every page loaded so far.
+The cursor lives in a session-state mapping (st.session_state in the
+dashboard, a plain dict elsewhere) and is reset to the first page whenever
+the filters or sort order change, so a new selection never opens on a page
+that no longer exists.
+"""
+from typing import Hashable, MutableMapping, Tuple
+
+PAGE_SIZES = (12, 24, 48, 96)
+DEFAULT_PAGE_SIZE = 24
+
+PAGE_KEY = 'grid_page'
+FILTER_KEY = 'grid_filters'
+
+
+def page_count(n_items: int, page_size: int) -> int:
+    """Number of pages needed for n_items (at least 1, so an empty grid has a page)."""
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    return max(1, -(-n_items // page_size))
+
+
+def page_bounds(n_items: int, page_size: int, page: int, infinite: bool = False) -> Tuple[int, int]:
+    """[start, end) item positions shown on a page (clamped to the valid pages).
+
+    With infinite scroll every page up to `page` is shown, so start is 0.
+    """
+    page = min(max(page, 0), page_count(n_items, page_size) - 1)
+    end = min((page + 1) * page_size, n_items)
+    return (0 if infinite else page * page_size), end
+
+
+def current_page(state: MutableMapping, filters: Hashable, n_items: int, page_size: int) -> int:
+    """The page stored in `state`, reset to 0 when `filters` differ from the last call."""
+    if state.get(FILTER_KEY) != filters:
+        state[FILTER_KEY] = filters
+        state[PAGE_KEY] = 0
+    page = min(max(state.get(PAGE_KEY, 0), 0), page_count(n_items, page_size) - 1)
+    state[PAGE_KEY] = page
+    return page
@@ -0,0 +1,149 @@
+"""
+Durable append-only log of user ratings.
+
+Every rating is appended as one CSV line (user ID, product ID, product name,
+rating, Unix timestamp) so it survives a process restart. The name is logged
+because the dataset uses some Product IDs for several products. Every line is flushed to the
+file as it is appended, so a crash of the process loses nothing; only the
+fsync is batched. It runs after every `sync_every` ratings and from a
+background thread every `sync_interval` seconds, so an operating system
+crash or power loss loses at most that many ratings or about that many
+seconds of ratings, in exchange for much higher write throughput than one
+fsync per rating. close() syncs the rest and is also run at interpreter
+exit.
+
+Replay parses the log with pandas' C CSV parser. Once the log grows past
+`compact_every` lines it is compacted: the latest rating of every (user,
+product) pair is written to a columnar snapshot (a pickled DataFrame,
+replaced atomically) and the log is truncated. Replay then reads the
+snapshot plus the short log tail. Only one process should write to a log.
+"""
+import atexit
+import csv
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+LOG_FILE = "ratings.log"
+SNAPSHOT_FILE = "ratings.pkl"
+COLUMNS = ['User ID', 'Product ID', 'Product', 'Rating', 'Timestamp']
+
+DEFAULT_SYNC_EVERY = 256
+DEFAULT_SYNC_INTERVAL = 1.0
+DEFAULT_COMPACT_EVERY = 1_000_000
+
+
+class RatingLog:
+    """Append-only rating log in `directory` with batched fsync and compaction."""
+
+    def __init__(self, directory, sync_every: int = DEFAULT_SYNC_EVERY,
+                 sync_interval: float = DEFAULT_SYNC_INTERVAL, compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.directory / LOG_FILE
+        self.snapshot_path = self.directory / SNAPSHOT_FILE
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self._log_lines = self._open_existing_log()  # Lines in the log file
+        self._file = open(self.log_path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._pending = 0           # Lines written since the last fsync
+        self._closed = False
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._syncer = None
+        if sync_interval > 0:
+            self._syncer = threading.Thread(target=self._sync_loop, name='rating-log-sync', daemon=True)
+            self._syncer.start()
+        atexit.register(self.close)
+
+    def _open_existing_log(self, chunk_size: int = 1 << 20) -> int:
+        """Cut off a partial last line left by a crash mid-write and count the lines."""
+        if not self.log_path.exists():
+            return 0
+        lines = 0
+        last_newline = 0
+        with open(self.log_path, 'rb+') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                lines += chunk.count(b'\n')
+                cut = chunk.rfind(b'\n')
+                if cut >= 0:
+                    last_newline = f.tell() - len(chunk) + cut + 1
+            f.truncate(last_newline)
+        return lines
+
+    def append(self, user_id, product_id, product_name, rating: float, timestamp: Optional[float] = None):
+        """Append one rating; it is durable after the next sync."""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self._writer.writerow((user_id, product_id, product_name, rating, timestamp))
+            self._file.flush()
+            self._pending += 1
+            self._log_lines += 1
+            if self._pending >= self.sync_every:
+                self.sync()
+            if self._log_lines >= self.compact_every:
+                self.compact()
+
+    def sync(self):
+        """Fsync the lines written since the last sync to disk."""
+        with self._lock:
+            if self._pending and not self._closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._pending = 0
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.sync_interval):
+            self.sync()
+
+    def _read_log(self) -> pd.DataFrame:
+        self._file.flush()
+        if self.log_path.stat().st_size == 0:
+            return pd.DataFrame(columns=COLUMNS)
+        # IDs stay strings: the dataset's Product IDs are strings like 'P0274'
+        return pd.read_csv(self.log_path, names=COLUMNS, header=None,
+                           dtype={'User ID': str, 'Product ID': str, 'Product': str},
+                           keep_default_na=False, na_values={'Rating': [''], 'Timestamp': ['']})
+
+    def replay(self) -> pd.DataFrame:
+        """All logged ratings in write order (snapshot first, then the log)."""
+        parts = []
+        with self._lock:
+            if self.snapshot_path.exists():
+                parts.append(pd.read_pickle(self.snapshot_path))
+            parts.append(self._read_log())
+        ratings = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        return ratings.dropna(subset=['Rating'])
+
+    def compact(self):
+        """Fold the log into the snapshot, keeping the latest rating per (user, product ID, name)."""
+        with self._lock:
+            self.sync()
+            ratings = self.replay().drop_duplicates(subset=['User ID', 'Product ID', 'Product'], keep='last')
+            tmp = self.snapshot_path.with_suffix('.tmp')
+            ratings.reset_index(drop=True).to_pickle(tmp)
+            os.replace(tmp, self.snapshot_path)
+            # A crash before the truncate replays lines already in the snapshot, which is harmless
+            self._file.truncate(0)
+            self._file.seek(0)
+            self._log_lines = 0
+
+    def close(self):
+        """Stop the sync thread, then sync and close the log. Safe to call more than once."""
+        self._stop.set()
+        if self._syncer is not None and self._syncer is not threading.current_thread():
+            self._syncer.join()
+        with self._lock:
+            if self._closed:
+                return
+            self.sync()
+            self._closed = True
+            self._file.close()
+        atexit.unregister(self.close)
@@ -0,0 +1,221 @@
+"""
+In-memory store of user ratings with per-user and per-product indexes.
+
+Rating values, timestamps and the (user, product) codes live in parallel
+NumPy arrays that grow by doubling. Users and products are mapped to integer
+codes, and each code has a list of its slots in those arrays, so looking up
+one user's or one product's ratings costs O(their ratings) instead of a
+scan over every rating. A user re-rating a product overwrites its slot.
+
+Ratings imported from the dataset are flagged as historical (they are
+already part of the dataset's product ratings) until a user replaces them.
+"""
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+INITIAL_CAPACITY = 1024
+
+
+class RatingStore:
+    """Ratings keyed by (user ID, product ID); the latest rating of a pair wins.
+
+    IDs can be any hashable value; the recommender uses (Product ID, name)
+    tuples as product IDs.
+    """
+
+    def __init__(self):
+        self._user_ids: List[Hashable] = []       # user code -> user ID
+        self._product_ids: List[Hashable] = []    # product code -> product ID
+        self._user_codes: Dict[Hashable, int] = {}
+        self._product_codes: Dict[Hashable, int] = {}
+        self._slots_by_user: Dict[int, List[int]] = {}
+        self._slots_by_product: Dict[int, List[int]] = {}
+        self._users = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self._products = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self._values = np.empty(INITIAL_CAPACITY, dtype=np.float32)
+        self._timestamps = np.empty(INITIAL_CAPACITY, dtype=np.float64)  # Unix seconds, NaN if unknown
+        self._historical = np.empty(INITIAL_CAPACITY, dtype=bool)          # Imported from the dataset
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _code(self, codes: Dict[Hashable, int], ids: List[Hashable], key: Hashable) -> int:
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(ids)
+            ids.append(key)
+        return code
+
+    def _reserve(self, extra: int):
+        """Grow the arrays (doubling) so `extra` more ratings fit."""
+        needed = self._size + extra
+        if needed <= len(self._values):
+            return
+        capacity = max(needed, 2 * len(self._values))
+        for name in ('_users', '_products', '_values', '_timestamps', '_historical'):
+            array = getattr(self, name)
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            setattr(self, name, grown)
+
+    def _find_slot(self, user: Optional[int], product: Optional[int]) -> Optional[int]:
+        """Slot of a (user code, product code) pair, searching only that user's ratings."""
+        slots = self._slots_by_user.get(user)
+        if not slots or product is None:
+            return None
+        match = np.flatnonzero(self._products[slots] == product)
+        return slots[match[0]] if len(match) else None
+
+    def _pair_keys(self, users: np.ndarray, products: np.ndarray) -> np.ndarray:
+        return (users.astype(np.int64) << 32) | products.astype(np.int64)
+
+    def _find_slots(self, users: np.ndarray, products: np.ndarray) -> np.ndarray:
+        """Slots of many (user code, product code) pairs, -1 where a pair is not stored."""
+        slots = np.full(len(users), -1, dtype=np.int64)
+        if not self._size:
+            return slots
+        stored_keys = self._pair_keys(self._users[:self._size], self._products[:self._size])
+        order = np.argsort(stored_keys)
+        sorted_keys = stored_keys[order]
+        keys = self._pair_keys(users, products)
+        position = np.minimum(np.searchsorted(sorted_keys, keys), self._size - 1)
+        found = (sorted_keys[position] == keys) & (users >= 0) & (products >= 0)
+        slots[found] = order[position[found]]
+        return slots
+
+    def add(self, user_id, product_id, rating: float, timestamp: Optional[float] = None) -> Optional[float]:
+        """Store a rating and return the user's previous rating of the product (or None)."""
+        if timestamp is None:
+            timestamp = time.time()
+        user = self._code(self._user_codes, self._user_ids, user_id)
+        product = self._code(self._product_codes, self._product_ids, product_id)
+        slot = self._find_slot(user, product)
+        if slot is not None:
+            previous = float(self._values[slot])
+            self._values[slot] = rating
+            self._timestamps[slot] = timestamp
+            self._historical[slot] = False
+            return previous
+
+        self._reserve(1)
+        slot = self._size
+        self._users[slot], self._products[slot] = user, product
+        self._values[slot], self._timestamps[slot] = rating, timestamp
+        self._historical[slot] = False
+        self._size += 1
+        self._slots_by_user.setdefault(user, []).append(slot)
+        self._slots_by_product.setdefault(product, []).append(slot)
+        return None
+
+    def get(self, user_id, product_id) -> Optional[float]:
+        """The user's rating of the product, or None."""
+        slot = self._find_slot(self._user_codes.get(user_id), self._product_codes.get(product_id))
+        return None if slot is None else float(self._values[slot])
+
+    def get_many(self, user_ids, product_ids) -> np.ndarray:
+        """Ratings of many (user, product) pairs at once, NaN where a pair has no rating."""
+        users = np.array([self._user_codes.get(u, -1) for u in user_ids], dtype=np.int64)
+        products = np.array([self._product_codes.get(p, -1) for p in product_ids], dtype=np.int64)
+        slots = self._find_slots(users, products)
+        ratings = np.full(len(slots), np.nan)
+        ratings[slots >= 0] = self._values[slots[slots >= 0]]
+        return ratings
+
+    def is_historical(self, user_id, product_id) -> bool:
+        """True if the pair's rating was imported from the dataset and not replaced since."""
+        slot = self._find_slot(self._user_codes.get(user_id), self._product_codes.get(product_id))
+        return slot is not None and bool(self._historical[slot])
+
+    def historical_many(self, user_ids, product_ids) -> np.ndarray:
+        """is_historical for many (user, product) pairs at once."""
+        users = np.array([self._user_codes.get(u, -1) for u in user_ids], dtype=np.int64)
+        products = np.array([self._product_codes.get(p, -1) for p in product_ids], dtype=np.int64)
+        slots = self._find_slots(users, products)
+        historical = np.zeros(len(slots), dtype=bool)
+        historical[slots >= 0] = self._historical[slots[slots >= 0]]
+        return historical
+
+    def for_user(self, user_id) -> List[Tuple[Hashable, float, float]]:
+        """(product ID, rating, timestamp) of every rating by the user, oldest slot first."""
+        slots = self._slots_by_user.get(self._user_codes.get(user_id), [])
+        return [(self._product_ids[self._products[slot]], float(self._values[slot]), float(self._timestamps[slot]))
+                for slot in slots]
+
+    def for_product(self, product_id) -> List[Tuple[Hashable, float, float]]:
+        """(user ID, rating, timestamp) of every rating of the product."""
+        slots = self._slots_by_product.get(self._product_codes.get(product_id), [])
+        return [(self._user_ids[self._users[slot]], float(self._values[slot]), float(self._timestamps[slot]))
+                for slot in slots]
+
+    def bulk_import(self, user_ids, product_ids, ratings, timestamps=None, historical: bool = False) -> int:
+        """Add many ratings at once (e.g. historical ratings from the dataset).
+
+        Rows with a missing user, product or rating are skipped; when a pair
+        appears more than once the last row wins, as with repeated add()
+        calls. `historical` flags the ratings as imported from the dataset.
+        Returns the number of ratings imported.
+        """
+        frame = pd.DataFrame({'user': user_ids, 'product': product_ids,
+                              'rating': pd.to_numeric(pd.Series(ratings), errors='coerce').to_numpy(),
+                              'timestamp': np.nan if timestamps is None else timestamps})
+        frame = frame.dropna(subset=['user', 'product', 'rating'])
+        if frame.empty:
+            return 0
+        user_positions, unique_users = pd.factorize(frame['user'])
+        product_positions, unique_products = pd.factorize(frame['product'])
+        users = np.array([self._code(self._user_codes, self._user_ids, u) for u in unique_users.tolist()])
+        products = np.array([self._code(self._product_codes, self._product_ids, p)
+                             for p in unique_products.tolist()])
+        # Keep the last row of every pair, in row order
+        keys = self._pair_keys(users[user_positions], products[product_positions])
+        _, last = np.unique(keys[::-1], return_index=True)
+        keep = np.sort(len(keys) - 1 - last)
+        user_codes = users[user_positions[keep]]
+        product_codes = products[product_positions[keep]]
+
+        # Pairs already in the store are overwritten in place
+        existing = self._find_slots(user_codes, product_codes)
+        values = frame['rating'].to_numpy(dtype=np.float32)[keep]
+        stamps = frame['timestamp'].to_numpy(dtype=np.float64)[keep]
+        known = existing >= 0
+        self._values[existing[known]] = values[known]
+        self._timestamps[existing[known]] = stamps[known]
+        self._historical[existing[known]] = historical
+
+        new = ~known
+        count = int(new.sum())
+        self._reserve(count)
+        slots = np.arange(self._size, self._size + count)
+        self._users[slots], self._products[slots] = user_codes[new], product_codes[new]
+        self._values[slots], self._timestamps[slots] = values[new], stamps[new]
+        self._historical[slots] = historical
+        self._size += count
+        for index, codes in ((self._slots_by_user, user_codes[new]), (self._slots_by_product, product_codes[new])):
+            if not count:
+                break
+            order = np.argsort(codes, kind='stable')
+            sorted_codes = codes[order]
+            starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+            bounds = np.r_[starts, count].tolist()
+            ordered = slots[order].tolist()
+            for code, start, end in zip(sorted_codes[starts].tolist(), bounds[:-1], bounds[1:]):
+                index.setdefault(code, []).extend(ordered[start:end])
+        return len(keep)
+
+    def to_frame(self) -> pd.DataFrame:
+        """All ratings as a DataFrame with User ID, Product ID, Rating, Timestamp and Historical columns."""
+        size = self._size
+        # fromiter keeps tuple IDs (catalog keys) as single objects
+        user_ids = np.fromiter(self._user_ids, dtype=object, count=len(self._user_ids))
+        product_ids = np.fromiter(self._product_ids, dtype=object, count=len(self._product_ids))
+        return pd.DataFrame({
+            'User ID': user_ids[self._users[:size]],
+            'Product ID': product_ids[self._products[:size]],
+            'Rating': self._values[:size],
+            'Timestamp': self._timestamps[:size],
+            'Historical': self._historical[:size],
+        })
@@ -0,0 +1,93 @@
+"""
+Background worker that applies pending model updates off the request path.
+
+Callers `request()` an update whenever data or ratings change. The worker
+thread waits until requests have been quiet for `debounce` seconds (so a
+burst of ratings causes one update, not one per rating), but never longer
+than `max_delay` after the first unapplied request (so a steady stream of
+ratings is still picked up). The update itself runs on the worker thread;
+readers keep using the previously published model until it finishes.
+
+A thread is used rather than a process pool: the index build spends its
+time in NumPy matrix products that release the GIL, and the result must
+end up in the recommender's memory anyway.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_MAX_DELAY = 5.0
+
+
+class RebuildWorker:
+    """Daemon thread that runs `update` after debounced requests."""
+
+    def __init__(self, update: Callable[[], None], debounce: float = DEFAULT_DEBOUNCE,
+                 max_delay: float = DEFAULT_MAX_DELAY):
+        self.update = update
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self.runs = 0                   # Completed updates
+        self.last_error: Optional[BaseException] = None  # Error of the latest update, None once one succeeds
+        self._condition = threading.Condition()
+        self._first_request = None      # monotonic time of the first / last unapplied request
+        self._last_request = None
+        self._running = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='recommender-rebuild', daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> bool:
+        """True while a requested update has not finished yet."""
+        with self._condition:
+            return self._first_request is not None or self._running
+
+    def request(self):
+        """Ask for an update; it runs once requests have been quiet for `debounce` seconds."""
+        with self._condition:
+            now = time.monotonic()
+            if self._first_request is None:
+                self._first_request = now
+            self._last_request = now
+            self._condition.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no update is requested or running. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._stopped or (self._first_request is None and not self._running), timeout)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the thread; an update that is already running finishes first."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _next_deadline(self) -> float:
+        return min(self._last_request + self.debounce, self._first_request + self.max_delay)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopped or self._first_request is not None)
+                # Debounce: wait for a quiet period, bounded by max_delay
+                while not self._stopped and time.monotonic() < self._next_deadline():
+                    self._condition.wait(self._next_deadline() - time.monotonic())
+                if self._stopped:
+                    return
+                self._first_request = self._last_request = None
+                self._running = True
+            try:
+                self.update()
+                self.runs += 1
+                self.last_error = None
+            except Exception as e:  # Keep serving the previous model
+                self.last_error = e
+                print(f"Warning: background model update failed: {e}")
+            finally:
+                with self._condition:
+                    self._running = False
+                    self._condition.notify_all()
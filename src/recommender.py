@@ -1,33 +1,225 @@
+import threading
+import time
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.preprocessing import StandardScaler
-from typing import List, Tuple, Dict
-import datetime
+from typing import List, Tuple, Dict, Optional
 from pathlib import Path
+from scipy import sparse
+
+# Import neighbor index - handle both module import approaches
+try:
+    from neighbor_index import (build_partitioned_topk_index, build_topk_index, normalize_rows,
+                                refresh_topk_rows, select_topk, DEFAULT_TOP_K, DEFAULT_BLOCK_SIZE)
+    from collaborative import build_interaction_matrix, build_item_topk, normalize_items
+    from ann_index import IVFIndex, DEFAULT_PROBES
+    from rating_store import RatingStore
+    from rating_log import RatingLog
+    from model import RecommenderModel, group_rows, lookup_product_rows, product_keys
+    from rebuild_worker import RebuildWorker, DEFAULT_DEBOUNCE
+except ModuleNotFoundError:
+    from src.neighbor_index import (build_partitioned_topk_index, build_topk_index, normalize_rows,
+                                    refresh_topk_rows, select_topk, DEFAULT_TOP_K, DEFAULT_BLOCK_SIZE)
+    from src.collaborative import build_interaction_matrix, build_item_topk, normalize_items
+    from src.ann_index import IVFIndex, DEFAULT_PROBES
+    from src.rating_store import RatingStore
+    from src.rating_log import RatingLog
+    from src.model import RecommenderModel, group_rows, lookup_product_rows, product_keys
+    from src.rebuild_worker import RebuildWorker, DEFAULT_DEBOUNCE
+
+# Import column schema and data clean-up - handle both module import approaches
+try:
+    from schema import DatasetSchema, resolve_schema
+    from data_prep import normalize_dataset
+    from catalog import build_product_catalog
+    from snapshot import load_snapshot, save_snapshot, snapshot_dir, snapshot_key
+except ModuleNotFoundError:
+    from src.schema import DatasetSchema, resolve_schema
+    from src.data_prep import normalize_dataset
+    from src.catalog import build_product_catalog
+    from src.snapshot import load_snapshot, save_snapshot, snapshot_dir, snapshot_key
+
+# Buffered ratings are applied to the neighbor index in batches of this size
+DEFAULT_FLUSH_SIZE = 64
+# Number of incrementally applied ratings after which the index (and feature scaling) is rebuilt
+DEFAULT_REBUILD_THRESHOLD = 1000
+# Snapshots are stored next to the source file unless a directory is given
+DEFAULT_SNAPSHOT_DIR = ".recommender_cache"
+# How snapshot arrays are opened: 'r' read-only shared, 'c' copy-on-write, None private copy
+DEFAULT_MMAP_MODE = 'c'
+# Similarity backends: product features (exact or approximate), or users who bought/rated both products
+BACKENDS = ('content', 'ann', 'collaborative')
+
+
+def build_feature_matrix(data: pd.DataFrame, ratings: Optional[np.ndarray] = None,
+                         schema: Optional[DatasetSchema] = None
+                         ) -> Tuple[Optional[np.ndarray], Dict[str, Tuple[int, float, float]]]:
+    """Build the (N, d) product feature matrix used for similarity.
+
+    Features are the 0-1 normalized price (Sales) and rating plus a one-hot
+    category. `ratings` replaces the rating column (e.g. blended with user
+    ratings). Returns (features, scales) where scales maps the 'price' and
+    'rating' roles to their (column, min, max) so single rows can be
+    re-encoded later. features is None when no feature column is present.
+    """
+    if schema is None:
+        schema = resolve_schema(data.columns)
+    
+    # Select features for similarity calculation
+    numeric_features = {'price': schema.price, 'rating': schema.rating}
+    categorical_features = [schema.category]
+    
+    # Prepare feature matrix
+    feature_matrix = []
+    scales = {}
+    
+    # Add normalized numeric features
+    for role, feat in numeric_features.items():
+        if feat in data.columns:
+            values = data[feat].fillna(0)
+            if role == 'rating' and ratings is not None:
+                values = pd.Series(ratings, index=data.index)
+            # Normalize to 0-1 range
+            min_val = values.min()
+            max_val = values.max()
+            if max_val > min_val:
+                scales[role] = (len(feature_matrix), float(min_val), float(max_val))
+                normalized = (values - min_val) / (max_val - min_val)
+                feature_matrix.append(normalized)
+    
+    # Add one-hot encoded categorical features
+    for feat in categorical_features:
+        if feat in data.columns:
+            dummies = pd.get_dummies(data[feat], prefix=feat)
+            feature_matrix.extend([dummies[col] for col in dummies.columns])
+    
+    if not feature_matrix:
+        return None, scales
+    return np.vstack([np.asarray(col, dtype=np.float32) for col in feature_matrix]).T, scales
+
 
 class ProductRecommender:
-    def __init__(self, data_path: str):
-        """Initialize the recommender system with the dataset path."""
+    def __init__(self, data_path: str = None, top_k: int = DEFAULT_TOP_K, block_size: int = DEFAULT_BLOCK_SIZE,
+                 flush_size: int = DEFAULT_FLUSH_SIZE, rebuild_threshold: int = DEFAULT_REBUILD_THRESHOLD,
+                 data: Optional[pd.DataFrame] = None, column_map: Optional[Dict[str, str]] = None,
+                 aggregate: bool = True, use_snapshot: bool = True, snapshot_dir: Optional[str] = None,
+                 mmap_mode: Optional[str] = DEFAULT_MMAP_MODE, backend: str = 'content',
+                 ann_lists: Optional[int] = None, ann_probes: int = DEFAULT_PROBES,
+                 partition_by_category: bool = False, import_ratings: bool = True,
+                 rating_log_dir: Optional[str] = None, background_rebuild: bool = False,
+                 rebuild_debounce: float = DEFAULT_DEBOUNCE):
+        """Initialize the recommender system with the dataset path.
+
+        top_k is the number of neighbors kept per product and block_size the
+        number of rows scored at once while building the neighbor index.
+        New ratings are buffered and applied flush_size at a time; after
+        rebuild_threshold incremental ratings the index is fully rebuilt.
+        Pass `data` to use an in-memory DataFrame instead of reading a file,
+        and `column_map` (e.g. {'price': 'Price'}) to map schema roles to
+        differently named columns. With `aggregate` the order lines are
+        collapsed into one row per product before building the index.
+        With `use_snapshot` the prepared data and index are cached in
+        `snapshot_dir` and reloaded while the source file is unchanged.
+        `mmap_mode` controls how the snapshot's numeric arrays are opened:
+        'r' or 'c' memory-maps them so several processes (e.g. Streamlit
+        replicas) share one copy through the OS page cache; None loads a
+        private copy into every process.
+        `backend` selects the similarity: 'content' compares price, rating
+        and category; 'ann' uses the same features with an approximate
+        (IVF) index of `ann_lists` clusters, scoring only the `ann_probes`
+        nearest clusters per product; 'collaborative' compares which users
+        bought or rated the products (item-item CF). With the collaborative
+        backend new ratings are picked up at the next full rebuild.
+        With `partition_by_category` the content index is built from
+        within-category blocks, falling back to the whole catalog only for
+        products a cross-category neighbor could reach (same result, less work).
+        With `import_ratings` the dataset's historical (User ID, Rating)
+        pairs are loaded into the rating store at start-up.
+        With `rating_log_dir` every new rating is also appended to a durable
+        rating log in that directory, and the log is replayed at start-up so
+        ratings survive a restart.
+
+        One instance can be shared by many threads (e.g. Streamlit
+        sessions). Reads use the current immutable RecommenderModel and never
+        wait; rating updates and rebuilds are serialized by a lock and
+        publish a new model when they are done.
+        With `background_rebuild` new ratings and rebuilds are applied by a
+        worker thread once updates have been quiet for `rebuild_debounce`
+        seconds, so neither add_rating nor reads ever run an update; reads
+        serve the previous model until the new one is published.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}")
+        self.backend = backend
+        self.ann_lists = ann_lists
+        self.ann_probes = ann_probes
+        self.partition_by_category = partition_by_category
         self.data_path = data_path
+        self.column_map = column_map or {}
+        self.aggregate = aggregate
+        self.orders = None  # Normalized order lines; `data` holds the product catalog
+        self.use_snapshot = use_snapshot
+        self.snapshot_dir = snapshot_dir
+        if mmap_mode not in ('r', 'c', None):
+            raise ValueError("mmap_mode must be 'r', 'c' or None")
+        self.mmap_mode = mmap_mode
+        self._snapshot_path = None  # (directory, key) of the current source file
+        self._lock = threading.RLock()          # Serializes writers (ratings, rebuilds, new data)
+        self._ratings_lock = threading.Lock()   # Guards the rating store and buffer, held only briefly
+        self._worker = None                     # Background updates, if enabled
+        self._model = RecommenderModel()        # What readers see; replaced, never modified
+        self.schema = DatasetSchema()  # Resolved column names, set with the data
+        self._row_by_name = {}        # Product name -> first row position
+        self._rows_by_product_id = {} # Product ID -> all row positions
+        self._rows_by_product_key = {}  # (Product ID, name) catalog key -> all row positions
+        self._product_keys = np.empty(0, dtype=object)  # Catalog key of every row
         self.data = None
-        self.similarity_matrix = None
-        self.product_names = None
-        self.user_ratings = {}  # Store new user ratings
-        possible_paths = [
-            Path(__file__).parent.parent / "ecommerce_dataset.csv",  # new cleaned dataset
-            Path("ecommerce_dataset.csv"),  # current directory
-            Path(__file__).parent / "ecommerce_dataset.csv",  # src directory
-            Path(__file__).parent.parent / "ecommerce_dataset_updated.csv",  # fallback to other updated
-            Path(__file__).parent.parent / "ecommerce dataset.csv",  # fallback to original
-            Path("ecommerce dataset.csv"),
-            Path(__file__).parent / "ecommerce dataset.csv"
-        ]
-        for path in possible_paths:
-            if path.exists():
-                self.data_path = path
-                break
-        self.load_and_prepare_data()
+        self.top_k = top_k
+        self.block_size = block_size
+        self.neighbor_indices = None  # (N, K) row positions of the most similar products
+        self.neighbor_scores = None   # (N, K) cosine similarity of those products
+        self.user_ratings = RatingStore()  # Historical and new ratings by user and product
+        self.rating_log = None             # Durable log of new ratings, if enabled
+        self.flush_size = flush_size
+        self.rebuild_threshold = rebuild_threshold
+        self._features = None        # Raw (N, d) feature matrix of the last build
+        self._unit_features = None   # Row-normalized copy used for cosine scores
+        self._item_users = None      # Collaborative backend: unit (items x users) sparse matrix
+        self._ann_index = None       # ANN backend: IVF clusters over the unit features
+        self._feature_scales = {}
+        self._rating_sum = None      # Per-row sum and count of user ratings
+        self._rating_count = None
+        self._rating_buffer = []     # (product_id, rating delta, count delta) not yet applied
+        self._ratings_since_rebuild = 0
+        self._rebuild_pending = False
+        if data is not None:
+            self.data = data.reset_index(drop=True)
+            self._prepare_data()
+        else:
+            possible_paths = [
+                Path(__file__).parent.parent / "ecommerce_dataset.csv",  # new cleaned dataset
+                Path("ecommerce_dataset.csv"),  # current directory
+                Path(__file__).parent / "ecommerce_dataset.csv",  # src directory
+                Path(__file__).parent.parent / "ecommerce_dataset_updated.csv",  # fallback to other updated
+                Path(__file__).parent.parent / "ecommerce dataset.csv",  # fallback to original
+                Path("ecommerce dataset.csv"),
+                Path(__file__).parent / "ecommerce dataset.csv"
+            ]
+            # Only fall back to the default locations if the given path does not exist
+            if data_path is None or not Path(data_path).exists():
+                for path in possible_paths:
+                    if path.exists():
+                        self.data_path = path
+                        break
+            self.load_and_prepare_data()
+        if import_ratings:
+            self.import_historical_ratings()
+        if rating_log_dir is not None:
+            self.rating_log = RatingLog(rating_log_dir)
+            self.replay_rating_log()
+        if background_rebuild:
+            self._worker = RebuildWorker(self._apply_pending, debounce=rebuild_debounce)
+            self._schedule_update()
 
     def load_and_prepare_data(self):
         """Load and preprocess the product dataset."""
@@ -37,6 +229,11 @@ class ProductRecommender:
             print(f"Warning: Data file not found at {self.data_path}")
             self.data = pd.DataFrame()  # Create empty DataFrame
             return
+        
+        # Reuse the prepared data and index if the source file has not changed
+        self._snapshot_path = None
+        if self.use_snapshot and self._load_snapshot():
+            return
             
         # Try to load with different encodings
         try:
@@ -49,34 +246,123 @@ class ProductRecommender:
                 self.data = pd.DataFrame()  # Create empty DataFrame
                 return
         
+        self._prepare_data()
+        if self.use_snapshot and self._save_snapshot() and self.mmap_mode is not None:
+            # Swap the freshly built arrays for shared mappings of the snapshot files
+            self._load_snapshot(arrays_only=True)
+
+    def _snapshot_location(self) -> Tuple[Path, str]:
+        """Snapshot directory and key for the current source file and settings."""
+        # Hash the source file only once per load
+        if self._snapshot_path is None:
+            settings = {'top_k': self.top_k, 'aggregate': self.aggregate, 'column_map': self.column_map,
+                        'backend': self.backend, 'partition_by_category': self.partition_by_category}
+            if self.backend == 'ann':
+                settings.update({'ann_lists': self.ann_lists, 'ann_probes': self.ann_probes})
+            key = snapshot_key(self.data_path, settings)
+            cache_dir = self.snapshot_dir or Path(self.data_path).parent / DEFAULT_SNAPSHOT_DIR
+            self._snapshot_path = (snapshot_dir(cache_dir, self.data_path, key), key)
+        return self._snapshot_path
+
+    def _save_snapshot(self) -> bool:
+        """Persist the prepared data and neighbor index for the next cold start."""
+        if self.data is None or self.data.empty or self.neighbor_indices is None:
+            return False
+        frames = {'orders': self.orders}
+        if self.data is not self.orders:
+            frames['catalog'] = self.data
+        arrays = {
+            'neighbor_indices': self.neighbor_indices,
+            'neighbor_scores': self.neighbor_scores,
+        }
+        meta = {'feature_scales': self._feature_scales}
+        if self._item_users is not None:
+            arrays.update({'cf_data': self._item_users.data, 'cf_indices': self._item_users.indices,
+                           'cf_indptr': self._item_users.indptr})
+            meta['cf_shape'] = list(self._item_users.shape)
+        else:
+            arrays.update({'features': self._features, 'unit_features': self._unit_features})
+        if self._ann_index is not None:
+            arrays.update(self._ann_index.arrays())
+        try:
+            directory, key = self._snapshot_location()
+            save_snapshot(directory, key, frames, arrays, meta=meta)
+        except OSError as e:
+            print(f"Warning: could not write snapshot: {e}")
+            return False
+        return True
+
+    def _load_snapshot(self, arrays_only: bool = False) -> bool:
+        """Load the prepared data and neighbor index from a snapshot, if a fresh one exists.
+
+        With arrays_only the current DataFrames are kept and only the numeric
+        arrays are replaced by the snapshot's (memory-mapped) copies.
+        """
+        directory, key = self._snapshot_location()
+        snapshot = load_snapshot(directory, key, mmap_mode=self.mmap_mode, load_frames=not arrays_only)
+        if snapshot is None:
+            return False
+        frames, arrays, meta = snapshot
+        
+        if not arrays_only:
+            self.orders = frames['orders']
+            self.data = frames.get('catalog', self.orders)
+        self._features = arrays.get('features')
+        self._unit_features = arrays.get('unit_features')
+        self._item_users = None
+        if 'cf_shape' in meta:
+            self._item_users = sparse.csr_matrix(
+                (arrays['cf_data'], arrays['cf_indices'], arrays['cf_indptr']), shape=tuple(meta['cf_shape']))
+        self._ann_index = IVFIndex.from_arrays(arrays) if 'ann_centroids' in arrays else None
+        self.neighbor_indices = arrays['neighbor_indices']
+        self.neighbor_scores = arrays['neighbor_scores']
+        self._feature_scales = {role: tuple(scale) for role, scale in meta['feature_scales'].items()}
+        self._rating_sum = np.zeros(len(self.data))
+        self._rating_count = np.zeros(len(self.data))
+        self._rebuild_pending = False
+        self._publish()
+        if not arrays_only:
+            print(f"Loaded {len(self.data)} products from snapshot {directory}")
+        return True
+
+    def _ensure_writable(self):
+        """Copy read-only arrays (published to readers or memory-mapped) before updating them in place."""
+        for name in ('_features', '_unit_features', 'neighbor_indices', 'neighbor_scores'):
+            array = getattr(self, name)
+            if array is not None and not array.flags.writeable:
+                setattr(self, name, np.array(array))
+
+    def _prepare_data(self):
+        """Fill missing values in the loaded data and build the neighbor index."""
         # Print original dataset size
-        print(f"Original dataset size: {len(self.data)} products")
+        print(f"Original dataset size: {len(self.data)} order lines")
         
         # Keep track of original dataset size
         original_size = len(self.data)
         
-        # Handle missing image URLs with placeholder images instead of filtering them out
-        for index, row in self.data.iterrows():
-            if pd.isna(row['Product Image URL']) or not isinstance(row['Product Image URL'], str) or not row['Product Image URL'].strip():
-                category = row['Category']
-                if pd.isna(category):
-                    category = 'Product'
-                category_str = str(category).replace(' ', '+')
-                self.data.at[index, 'Product Image URL'] = f"https://via.placeholder.com/140x140?text={category_str}"
+        # Fill missing values and use placeholder images instead of filtering products out
+        self.data = normalize_dataset(self.data, self.schema)
+        category_col = self.schema.category
+        
+        # Collapse order lines into one row per product to shrink the similarity work
+        self.orders = self.data
+        if self.aggregate:
+            self.data = build_product_catalog(self.orders, self.schema)
+            print(f"Product catalog: {len(self.data)} products from {len(self.orders)} order lines")
         
         print(f"Products with image URLs (including placeholders): {len(self.data)}")
         
         # Print counts by category
+        category_counts = self.data[category_col].value_counts() if category_col else pd.Series(dtype=int)
         print("Products by category:")
-        print(self.data['Category'].value_counts())
+        print(category_counts)
         
         # Identify important categories for special handling
         important_categories = ['Luxury Jewelry', 'Make up']
         
         # Print only summary information about important categories
         for category in important_categories:
-            category_products = self.data[self.data['Category'] == category]
-            print(f"Found {len(category_products)} products in category '{category}'")
+            print(f"Found {category_counts.get(category, 0)} products in category '{category}'")
         
         # IMPORTANT: Use ALL products - no more limiting to 100
         # This ensures all categories have their products displayed
@@ -88,7 +374,7 @@ class ProductRecommender:
         
         print(f"Final dataset size: {len(self.data)} products")
         print("Final category distribution:")
-        print(self.data['Category'].value_counts())
+        print(category_counts)
         
         # Reset index after filtering
         self.data = self.data.reset_index(drop=True)
@@ -99,179 +385,621 @@ class ProductRecommender:
         # Calculate similarity matrix for this smaller dataset
         self._update_similarity_matrix()
 
-    def _update_similarity_matrix(self):
-        """Update the similarity matrix based on product features."""
-        # Select features for similarity calculation
-        numeric_features = ['Sales', 'Rating']
-        categorical_features = ['Category']
+    @property
+    def data(self) -> Optional[pd.DataFrame]:
+        """The product table. Assigning a new table rebuilds the lookup indexes."""
+        return self._data
+
+    @data.setter
+    def data(self, value: Optional[pd.DataFrame]):
+        with self._lock:
+            self._data = value
+            # Resolve the column schema once per table instead of once per call
+            if value is None:
+                self.schema = DatasetSchema()
+            else:
+                # The product catalog has no buyer column, so a mapped 'user' role may be absent
+                column_map = {role: col for role, col in self.column_map.items()
+                              if role != 'user' or col in value.columns}
+                self.schema = resolve_schema(value.columns, column_map)
+            self.rebuild_lookups()
+
+    def rebuild_lookups(self):
+        """Build the name -> row, Product ID -> rows and catalog key -> rows hash indexes.
+
+        Call this after editing the name or Product ID columns in place;
+        assigning `data` does it automatically. The lookups are published to
+        readers together with the neighbor index.
+        """
+        self._row_by_name = {}
+        self._rows_by_product_id = {}
+        self._rows_by_product_key = {}
+        self._product_keys = np.empty(0, dtype=object)
+        if self._data is None or self._data.empty:
+            return
+        
+        if self.schema.name is not None:
+            names = self._data[self.schema.name]
+            # Keep the first row of every name, like the old boolean-mask lookups
+            positions = np.flatnonzero((~names.duplicated() & names.notna()).to_numpy())
+            self._row_by_name = dict(zip(names.to_numpy()[positions].tolist(), positions.tolist()))
+        
+        if self.schema.product_id is not None:
+            product_ids = self._data[self.schema.product_id].to_numpy()
+            self._rows_by_product_id = pd.Series(np.arange(len(product_ids))).groupby(product_ids).indices
         
-        # Prepare feature matrix
-        feature_matrix = []
+        # Ratings are keyed by (Product ID, name): a Product ID can name several products
+        if self._key_columns():
+            self._product_keys = product_keys(self._data, self._key_columns())
+            self._rows_by_product_key = group_rows(self._product_keys)
         
-        # Add normalized numeric features
-        for feat in numeric_features:
-            if feat in self.data.columns:
-                values = self.data[feat].fillna(0)
-                # Normalize to 0-1 range
-                min_val = values.min()
-                max_val = values.max()
-                if max_val > min_val:
-                    normalized = (values - min_val) / (max_val - min_val)
-                    feature_matrix.append(normalized)
+        if self.neighbor_indices is not None and len(self.neighbor_indices) == len(self._data):
+            self._publish()
+        else:
+            # The index does not match the new table: readers keep the old model until the rebuild
+            self._rebuild_pending = True
+            self._schedule_update()
+
+    @property
+    def model(self) -> RecommenderModel:
+        """The model readers currently see (immutable; replaced after every update)."""
+        return self._model
+
+    def status(self) -> Dict:
+        """Version and age of the served model and whether an update is outstanding."""
+        model = self._model
+        return {
+            'version': model.version,
+            'age_seconds': model.age,
+            'buffered_ratings': len(self._rating_buffer),
+            'rebuild_pending': self._rebuild_pending,
+            'updating': self._worker is not None and self._worker.pending,
+            'last_error': None if self._worker is None or self._worker.last_error is None
+                          else str(self._worker.last_error),
+        }
+
+    def close(self):
+        """Stop the background worker and sync the rating log."""
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+        if self.rating_log is not None:
+            self.rating_log.close()
+            self.rating_log = None
+
+    def _publish(self):
+        """Publish the current table, lookups and index as a new model for readers."""
+        self._model = RecommenderModel(
+            data=self._data, schema=self.schema, row_by_name=self._row_by_name,
+            rows_by_product_key=self._rows_by_product_key, neighbor_indices=self.neighbor_indices,
+            neighbor_scores=self.neighbor_scores, unit_features=self._unit_features,
+            item_users=self._item_users, ann_index=self._ann_index, version=self._model.version + 1)
+
+    def _update_similarity_matrix(self):
+        """Rebuild the top-K neighbor index based on product features and publish it."""
+        with self._lock:
+            if self._rating_sum is None or len(self._rating_sum) != len(self.data):
+                self._rating_sum = np.zeros(len(self.data))
+                self._rating_count = np.zeros(len(self.data))
+            
+            if self.backend == 'collaborative':
+                self._update_collaborative_index()
+                return
+            
+            features, self._feature_scales = build_feature_matrix(self.data, ratings=self._effective_ratings(),
+                                                                  schema=self.schema)
+            if features is None:
+                # Fallback to simple similarity: every other product scores 0
+                features = np.zeros((len(self.data), 1), dtype=np.float32)
+            self._features = features
+            self._unit_features = normalize_rows(features)
+            if self.backend == 'ann':
+                self._ann_index = IVFIndex.build(self._unit_features, n_lists=self.ann_lists)
+                self.neighbor_indices, self.neighbor_scores = self._ann_index.build_topk(
+                    self._unit_features, k=self.top_k, n_probe=self.ann_probes)
+            elif self.partition_by_category and self.schema.category is not None:
+                # build_feature_matrix puts the numeric features before the one-hot categories
+                self.neighbor_indices, self.neighbor_scores = build_partitioned_topk_index(
+                    self._unit_features, self.data[self.schema.category].to_numpy(),
+                    shared_columns=len(self._feature_scales), k=self.top_k, block_size=self.block_size)
+            else:
+                self.neighbor_indices, self.neighbor_scores = build_topk_index(
+                    self._unit_features, k=self.top_k, block_size=self.block_size)
+            
+            self._ratings_since_rebuild = 0
+            self._rebuild_pending = False
+            self._publish()
+
+    def _update_collaborative_index(self):
+        """Rebuild the item-item CF neighbor index from order lines and user ratings."""
+        users, items, values = self._interactions()
+        self._item_users = normalize_items(build_interaction_matrix(users, items, values, len(self.data)))
+        self._features = self._unit_features = None
+        self._feature_scales = {}
+        self.neighbor_indices, self.neighbor_scores = build_item_topk(
+            self._item_users, k=self.top_k, block_size=self.block_size)
         
-        # Add one-hot encoded categorical features
-        for feat in categorical_features:
-            if feat in self.data.columns:
-                dummies = pd.get_dummies(self.data[feat], prefix=feat)
-                feature_matrix.extend([dummies[col] for col in dummies.columns])
+        self._ratings_since_rebuild = 0
+        self._rebuild_pending = False
+        self._publish()
+
+    def _interactions(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(user, product row, strength) of every purchase and user rating.
+
+        A purchase counts 1, a rating its value / 5. Ratings imported from the
+        dataset are left out: their order lines already count as purchases.
+        Like order lines, ratings count for the first row of their catalog key.
+        """
+        parts = []
+        orders = self.orders if self.orders is not None else self.data
+        order_schema = resolve_schema(orders.columns, self.column_map)
+        keys = [col for col in (self.schema.product_id, self.schema.name) if col is not None]
+        if order_schema.user is not None and keys and all(col in orders.columns for col in keys):
+            # Map every order line to its product row (the first row with the same keys)
+            product_keys = pd.MultiIndex.from_frame(self.data[keys].drop_duplicates())
+            first_rows = self.data[keys].drop_duplicates().index.to_numpy()
+            positions = product_keys.get_indexer(pd.MultiIndex.from_frame(orders[keys]))
+            found = (positions >= 0) & orders[order_schema.user].notna().to_numpy()
+            parts.append(pd.DataFrame({'user': orders[order_schema.user].to_numpy()[found],
+                                       'item': first_rows[positions[found]], 'value': 1.0}))
+        else:
+            print("Warning: no user ID column found; collaborative filtering only uses user ratings")
         
-        # Convert to numpy array and calculate similarity
-        if feature_matrix:
-            features = np.vstack(feature_matrix).T
-            self.similarity_matrix = cosine_similarity(features)
+        with self._ratings_lock:
+            ratings = self.user_ratings.to_frame()
+        ratings = ratings[~ratings['Historical'].to_numpy()]
+        codes, rated_keys = pd.factorize(ratings['Product ID'].to_numpy())
+        rated_rows = np.array([-1 if rows is None else rows[0]
+                               for rows in map(self._rows_for_product_key, rated_keys)], dtype=np.int64)
+        items = np.append(rated_rows, -1)[codes]  # factorize codes missing keys as -1
+        found = items >= 0
+        if found.any():
+            parts.append(pd.DataFrame({'user': ratings['User ID'].to_numpy()[found], 'item': items[found],
+                                       'value': ratings['Rating'].to_numpy()[found] / 5}))
+        if not parts:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.int64), np.empty(0)
+        interactions = pd.concat(parts, ignore_index=True)
+        # Compare user IDs as strings so ratings match the dataset's user IDs
+        return (interactions['user'].astype(str).to_numpy(), interactions['item'].to_numpy(dtype=np.int64),
+                interactions['value'].to_numpy(dtype=float))
+
+    def _effective_ratings(self, rows: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Dataset rating blended with the user ratings received for each row."""
+        if self.schema.rating is None:
+            return None
+        if rows is None:
+            rows = slice(None)
+        base = self.data[self.schema.rating].fillna(0).to_numpy(dtype=float)[rows]
+        # An aggregated row's rating is a mean over its Order Count order lines, so it weighs that much
+        if 'Order Count' in self.data.columns:
+            weight = self.data['Order Count'].fillna(1).clip(lower=1).to_numpy(dtype=float)[rows]
         else:
-            # Fallback to simple similarity
-            self.similarity_matrix = np.eye(len(self.data))
+            weight = 1.0
+        return (base * weight + self._rating_sum[rows]) / (weight + self._rating_count[rows])
+
+    def _rating_updates(self, ratings: np.ndarray, previous: np.ndarray,
+                        historical: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Rating sum and count changes for new user ratings.
+
+        `previous` is the pair's earlier rating (NaN if none) and `historical`
+        marks earlier ratings imported from the dataset. A replaced user rating
+        is already in the rating sum, so only the difference is added. A
+        replaced historical rating is one of the order lines averaged into an
+        aggregated row's base rating and is replaced the same way; without
+        aggregation the base is a single order line, so the new rating counts
+        as an additional one.
+        """
+        replaces = ~np.isnan(previous)
+        if 'Order Count' not in self.data.columns:
+            replaces &= ~historical
+        deltas = ratings - np.where(replaces, previous, 0)
+        return deltas, (~replaces).astype(np.int64)
 
     def add_rating(self, user_id: str, product_id: str, rating: float):
-        """Add a new user rating."""
+        """Add a new user rating.
+
+        `product_id` is a row position (as returned by get_product_id_by_name),
+        a (Product ID, name) catalog key or a Product ID; a Product ID shared
+        by differently named products raises ValueError. The rating is
+        buffered and applied to the neighbor index in batches; only the rated
+        product's feature row and neighbor lists are refreshed.
+        """
         if not isinstance(rating, (int, float)) or rating < 1 or rating > 5:
             raise ValueError("Rating must be between 1 and 5")
+        
+        timestamp = time.time()
+        product_key = self._resolve_product_key(product_id)
+        with self._ratings_lock:
+            historical = self.user_ratings.is_historical(user_id, product_key)
+            previous = self.user_ratings.add(user_id, product_key, rating, timestamp)
+            if self.rating_log is not None:
+                self.rating_log.append(user_id, *self._log_fields(product_key), rating, timestamp)
+            # A user re-rating a product replaces their previous rating
+            deltas, counts = self._rating_updates(np.array([float(rating)]),
+                                                  np.array([np.nan if previous is None else previous]),
+                                                  np.array([historical]))
+            self._rating_buffer.append((product_key, float(deltas[0]), int(counts[0])))
+            buffered = len(self._rating_buffer)
+        
+        if self._worker is not None:
+            self._worker.request()
+        elif buffered >= self.flush_size:
+            self._flush_ratings()
+
+    def _key_columns(self) -> List[str]:
+        """Columns of the (Product ID, name) catalog key, as in catalog.py."""
+        return [col for col in (self.schema.product_id, self.schema.name) if col is not None]
+
+    def _resolve_product_key(self, product_id):
+        """The catalog key a rating of `product_id` is stored and logged under.
+
+        Unknown products are kept as given, so their ratings are stored but
+        not applied.
+        """
+        if self._rows_for_product_key(product_id) is not None:
+            return product_id
+        rows = self._rows_for_product_id(product_id)
+        if rows is None or not len(self._product_keys):
+            return product_id
+        keys = set(self._product_keys[rows].tolist())
+        if len(keys) > 1:
+            raise ValueError(f"Product ID {product_id} is used by {len(keys)} products; "
+                             "pass the product's row position or (Product ID, name)")
+        return keys.pop()
+
+    def _log_fields(self, product_key) -> Tuple[str, str]:
+        """(Product ID, name) of a catalog key as written to the rating log ('' if unknown)."""
+        if not isinstance(product_key, tuple):  # A product not in the catalog
+            return str(product_key), ''
+        values = dict(zip(self._key_columns(), product_key))
+        return tuple('' if values.get(col) is None or pd.isna(values[col]) else str(values[col])
+                     for col in (self.schema.product_id, self.schema.name))
+
+    def _rows_for_product_key(self, product_key) -> Optional[np.ndarray]:
+        """Row positions of a catalog key (in the writer's table), or None if it is unknown."""
+        try:
+            return self._rows_by_product_key.get(product_key)
+        except TypeError:  # Unhashable input
+            return None
+
+    def _rows_for_product_id(self, product_id) -> Optional[np.ndarray]:
+        """Row positions a product ID appears in (in the writer's table), or None if it is unknown."""
+        return lookup_product_rows(self._rows_by_product_id, len(self.data), product_id)
+
+    def _flush_ratings(self):
+        """Apply buffered ratings to the affected feature rows and neighbor lists.
+
+        The published arrays are read-only, so the patch goes to private
+        copies which are then published as a new model.
+        """
+        with self._lock:
+            with self._ratings_lock:
+                buffer, self._rating_buffer = self._rating_buffer, []
+            if not buffer:
+                return
+            if self.data is None or self.data.empty or self._rating_sum is None:
+                return
             
-        key = f"{user_id}_{product_id}"
-        self.user_ratings[key] = {
-            'User ID': user_id,
-            'Product ID': product_id,
-            'Rating': rating,
-            'Timestamp': datetime.datetime.now().isoformat()
-        }
-        # Update similarity matrix with new rating
-        self._update_similarity_matrix()
+            changed = set()
+            for product_key, delta, count in buffer:
+                rows = self._rows_for_product_key(product_key)
+                if rows is None:
+                    continue
+                self._rating_sum[rows] += delta
+                self._rating_count[rows] += count
+                changed.update(rows.tolist())
+            
+            self._ratings_since_rebuild += len(buffer)
+            if self._ratings_since_rebuild >= self.rebuild_threshold:
+                # Too many incremental patches: schedule a full rebuild (next read or background worker)
+                self._rebuild_pending = True
+            if self._rebuild_pending or not changed or 'rating' not in self._feature_scales:
+                return
+            
+            # Re-encode the Rating feature with the scale of the last full build
+            self._ensure_writable()
+            rows = np.fromiter(changed, dtype=np.int64)
+            column, min_val, max_val = self._feature_scales['rating']
+            normalized = (self._effective_ratings(rows) - min_val) / (max_val - min_val)
+            self._features[rows, column] = np.clip(normalized, 0, 1)
+            self._unit_features[rows] = normalize_rows(self._features[rows])
+            refresh_topk_rows(self._unit_features, self.neighbor_indices, self.neighbor_scores, rows,
+                              block_size=self.block_size)
+            self._publish()
+
+    def _apply_pending(self):
+        """Apply buffered ratings and run a scheduled rebuild."""
+        with self._lock:
+            self._flush_ratings()
+            if self._rebuild_pending:
+                self._update_similarity_matrix()
+
+    def _schedule_update(self):
+        """Hand pending updates to the background worker, if there is one."""
+        if self._worker is not None:
+            self._worker.request()
+
+    def _ensure_fresh(self):
+        """Apply buffered ratings and run a scheduled rebuild before serving reads.
+
+        With the background worker, or if another thread is already writing,
+        the read is served from the current model instead of waiting.
+        """
+        if self._worker is not None or (not self._rating_buffer and not self._rebuild_pending):
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._apply_pending()
+        finally:
+            self._lock.release()
+
+    def import_historical_ratings(self) -> int:
+        """Load the dataset's (User ID, product, Rating) order lines into the rating store.
+
+        These ratings are already part of each product's dataset rating, so
+        they are flagged as historical and not applied to the neighbor index
+        again. Returns the number of ratings imported.
+        """
+        orders = self.orders if self.orders is not None else self.data
+        if orders is None or orders.empty:
+            return 0
+        order_schema = resolve_schema(orders.columns, self.column_map)
+        keys = self._key_columns()
+        if None in (order_schema.user, order_schema.rating) or not keys:
+            return 0
+        if not all(col in orders.columns for col in keys):
+            return 0
+        timestamps = None
+        if 'Order Date' in orders.columns:
+            dates = pd.to_datetime(orders['Order Date'], format='mixed', errors='coerce')
+            timestamps = (dates - pd.Timestamp('1970-01-01')).dt.total_seconds().to_numpy()
+        with self._ratings_lock:
+            return self.user_ratings.bulk_import(orders[order_schema.user].to_numpy(),
+                                                 product_keys(orders, keys),
+                                                 orders[order_schema.rating].to_numpy(), timestamps,
+                                                 historical=True)
+
+    def replay_rating_log(self) -> int:
+        """Apply the ratings in the rating log (e.g. from before a restart).
+
+        Logged ratings are bulk-loaded into the rating store and their effect
+        on each product's rating is applied as one aggregated update per
+        product. The log gives (Product ID, name) back as strings; they are
+        mapped back to the catalog key they were logged for. Returns the
+        number of replayed ratings.
+        """
+        if self.rating_log is None:
+            return 0
+        ratings = self.rating_log.replay().drop_duplicates(subset=['User ID', 'Product ID', 'Product'], keep='last')
+        if ratings.empty:
+            return 0
+        users = ratings['User ID'].to_numpy()
+        # Products not in the catalog keep their logged Product ID, as in add_rating
+        products = ratings['Product ID'].to_numpy(dtype=object).copy()
+        catalog_keys = np.fromiter(self._rows_by_product_key, dtype=object, count=len(self._rows_by_product_key))
+        if len(catalog_keys):
+            fields = pd.MultiIndex.from_tuples([self._log_fields(key) for key in catalog_keys])
+            unique = ~fields.duplicated()
+            positions = fields[unique].get_indexer(pd.MultiIndex.from_arrays([ratings['Product ID'], ratings['Product']]))
+            products[positions >= 0] = catalog_keys[unique][positions[positions >= 0]]
+        values = ratings['Rating'].to_numpy(dtype=float)
+        with self._lock:
+            # Same bookkeeping as add_rating
+            with self._ratings_lock:
+                previous = self.user_ratings.get_many(users, products)
+                historical = self.user_ratings.historical_many(users, products)
+                self.user_ratings.bulk_import(users, products, values, ratings['Timestamp'].to_numpy(dtype=float))
+            delta, count = self._rating_updates(values, previous, historical)
+            codes, unique_products = pd.factorize(products)
+            totals = pd.DataFrame({'delta': delta, 'count': count}).groupby(codes, sort=False).sum()
+            with self._ratings_lock:
+                self._rating_buffer.extend(zip(unique_products[totals.index], totals['delta'], totals['count']))
+            self._flush_ratings()
+        print(f"Replayed {len(ratings)} ratings from the rating log")
+        return len(ratings)
 
     def get_user_ratings(self, user_id: str) -> List[Tuple[str, float]]:
-        """Get all ratings for a specific user."""
+        """Get all ratings for a specific user as (product name, rating)."""
+        model = self._model
+        with self._ratings_lock:
+            entries = self.user_ratings.for_user(user_id)
         user_ratings = []
-        for key, data in self.user_ratings.items():
-            if data['User ID'] == user_id:
-                product_name = self.product_names.loc[data['Product ID'], 'Product Name']
-                user_ratings.append((product_name, data['Rating']))
+        for product_key, rating, _ in entries:
+            rows = model.rows_for_product_key(product_key)
+            if rows is not None and model.schema.name is not None:
+                product_name = model.data[model.schema.name].iloc[rows[0]]
+            else:
+                product_name = product_key
+            user_ratings.append((product_name, rating))
         return user_ratings
 
     def get_recommendations(self, product_name: str, n: int = 5) -> List[Dict]:
         """Get N product recommendations similar to the given product."""
+        self._ensure_fresh()
+        model = self._model
         # Handle case where data is empty
-        if self.data is None or self.data.empty:
+        if model.empty:
             print("No data available for recommendations")
             return []
             
         try:
             # Find the index of the product
-            product_col = [col for col in self.data.columns if 'name' in col.lower() or 'product' in col.lower()][0]
-            
-            if product_name not in self.data[product_col].values:
+            idx = model.row_of(product_name)
+            if idx is None:
                 print(f"Product {product_name} not found in the dataset")
                 return []
-                
-            idx = self.data[self.data[product_col] == product_name].index[0]
-            
-            # Get similarity scores
-            sim_scores = list(enumerate(self.similarity_matrix[idx]))
-            
-            # Sort products by similarity
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-            
-            # Get top N most similar products (excluding itself)
-            sim_scores = sim_scores[1:n+1]
-            
-            # Get product indices
-            product_indices = [i[0] for i in sim_scores]
+            if n <= 0:
+                return []
             
-            # Return recommendations with similarity scores
-            recommendations = []
-            for idx, score in zip(product_indices, [s[1] for s in sim_scores]):
-                product = self.data.iloc[idx]
-                recommendations.append({
-                    'name': product[product_col],
-                    'category': product.get('Category', 'Unknown'),
-                    'price': product.get('Sales', 0),
-                    'similarity': score,
-                    'image_url': product.get('Product Image URL', ''),
-                    'rating': product.get('Rating', 0)
-                })
+            if n <= model.neighbor_indices.shape[1]:
+                # Neighbor lists are already sorted by similarity and exclude the product itself
+                product_indices = model.neighbor_indices[idx][:n]
+                product_scores = model.neighbor_scores[idx][:n]
+            else:
+                # More than K requested: score this product against the whole catalog
+                # (or, with the ANN backend, against its nearest clusters)
+                n = min(n, len(model.data) - 1)
+                if n <= 0:
+                    return []
+                if model.ann_index is not None:
+                    product_indices, product_scores = model.ann_index.search(
+                        model.unit_features, idx, n, n_probe=self.ann_probes)
+                else:
+                    top, top_scores = select_topk(model.similarity_rows([idx]), n)
+                    product_indices, product_scores = top[0], top_scores[0]
             
-            return recommendations
+            return self._build_recommendations(model, product_indices, product_scores)
         
         except (IndexError, KeyError) as e:
             print(f"Error getting recommendations: {str(e)}")
             return []
 
+    def get_recommendations_batch(self, product_names: List[str], n: int = 5, merge: Optional[str] = None,
+                                  exclude_seeds: bool = True):
+        """Get recommendations for many products at once.
+
+        Neighbor rows for all known products are gathered in one step (or, for
+        n > K, scored with one matrix product and one top-N selection).
+        Without `merge` a dict {product name: [recommendations]} is returned,
+        with [] for unknown products. With merge='max' or merge='sum' the
+        seeds are blended into a single list of the n best distinct products,
+        scored by their best or summed similarity; `exclude_seeds` drops the
+        seed products themselves from that list.
+        """
+        if merge not in (None, 'max', 'sum'):
+            raise ValueError("merge must be None, 'max' or 'sum'")
+        empty = [] if merge else {name: [] for name in product_names}
+        self._ensure_fresh()
+        model = self._model
+        if model.empty:
+            print("No data available for recommendations")
+            return empty
+        
+        rows = [model.row_of(name) for name in product_names]
+        known = [(name, row) for name, row in zip(product_names, rows) if row is not None]
+        if not known:
+            return empty
+        seeds = np.array([row for _, row in known], dtype=np.int64)
+        
+        # When merging, fetch a few extra candidates per seed to survive de-duplication
+        # (never more than the N - 1 other products)
+        width = min(n + len(seeds) if merge else n, len(model.data) - 1)
+        if n <= 0 or width <= 0:
+            return empty
+        if width <= model.neighbor_indices.shape[1]:
+            indices = model.neighbor_indices[seeds, :width]
+            scores = model.neighbor_scores[seeds, :width]
+        else:
+            indices, scores = select_topk(model.similarity_rows(seeds), width)
+        
+        if not merge:
+            # Drop non-finite scores (a product's similarity to itself, or too few neighbors)
+            finite = np.isfinite(np.asarray(scores, dtype=float))
+            records = self._build_recommendations(model, indices[finite], np.asarray(scores)[finite])
+            bounds = np.concatenate([[0], np.cumsum(finite.sum(axis=1))])
+            results = {name: [] for name in product_names}
+            for i, (name, _) in enumerate(known):
+                results[name] = records[bounds[i]:bounds[i + 1]]
+            return results
+        
+        # Blend all seeds: one score per distinct candidate product
+        indices, scores = indices.ravel(), np.asarray(scores, dtype=float).ravel()
+        keep = np.isfinite(scores)
+        if exclude_seeds:
+            keep &= ~np.isin(indices, seeds)
+        candidates, inverse = np.unique(indices[keep], return_inverse=True)
+        if len(candidates) == 0:
+            return []
+        blended = np.full(len(candidates), -np.inf) if merge == 'max' else np.zeros(len(candidates))
+        if merge == 'max':
+            np.maximum.at(blended, inverse, scores[keep])
+        else:
+            np.add.at(blended, inverse, scores[keep])
+        top, top_scores = select_topk(blended[np.newaxis, :], n)
+        return self._build_recommendations(model, candidates[top[0]], top_scores[0])
+
+    def _build_recommendations(self, model: RecommenderModel, indices: np.ndarray,
+                               scores: np.ndarray) -> List[Dict]:
+        """Turn row positions of a model's table and scores into recommendation dicts.
+
+        Each column is gathered once for all rows instead of one row at a time.
+        """
+        def gather(column, default):
+            if column is None:
+                return [default] * len(indices)
+            return model.data[column].take(indices).tolist()
+        
+        schema = model.schema
+        columns = zip(gather(schema.name, ''), gather(schema.category, 'Unknown'), gather(schema.price, 0),
+                      np.asarray(scores, dtype=float).tolist(), gather(schema.image, ''),
+                      gather(schema.rating, 0))
+        return [
+            {'name': name, 'category': category, 'price': price, 'similarity': score,
+             'image_url': image_url, 'rating': rating}
+            for name, category, price, score, image_url, rating in columns
+        ]
+
     def get_all_product_names(self):
         """Get list of all product names."""
-        # Find the product name column
-        name_columns = [col for col in self.data.columns if 'name' in col.lower() or 'product' in col.lower()]
-        if not name_columns:
-            print("No product name column found in:", list(self.data.columns))
+        model = self._model
+        if model.schema.name is None:
+            print("No product name column found in:", [] if model.data is None else list(model.data.columns))
             return []
-        product_col = name_columns[0]
-        return list(self.data[product_col].dropna())
+        return list(model.data[model.schema.name].dropna())
     
     def get_product_id_by_name(self, product_name: str) -> str:
         """Get product ID from product name."""
-        product_col = [col for col in self.data.columns if 'name' in col.lower() or 'product' in col.lower()][0]
-        product_id = self.data[self.data[product_col] == product_name].index.values
-        return product_id[0] if len(product_id) > 0 else None
+        model = self._model
+        row = model.row_of(product_name)
+        return model.data.index[row] if row is not None else None
 
     def get_categories(self):
         """Get list of unique categories."""
-        if 'Category' not in self.data.columns:
+        model = self._model
+        if model.schema.category is None:
             return []
-        return sorted(list(self.data['Category'].dropna().unique()))
+        return sorted(list(model.data[model.schema.category].dropna().unique()))
         
     def get_countries(self):
         """Get list of unique countries."""
-        if 'Country' not in self.data.columns:
+        model = self._model
+        if model.schema.country is None:
             return []
-        return sorted(list(self.data['Country'].dropna().unique()))
+        return sorted(list(model.data[model.schema.country].dropna().unique()))
     
     def get_product_category(self, product_name):
         """Get category for a given product name."""
-        # Find the product name column
-        name_columns = [col for col in self.data.columns if 'name' in col.lower() or 'product' in col.lower()]
-        if not name_columns:
-            return "Unknown"
-        product_col = name_columns[0]
-        
-        try:
-            return self.data[self.data[product_col] == product_name]['Category'].iloc[0]
-        except (KeyError, IndexError):
+        model = self._model
+        row = model.row_of(product_name)
+        if row is None or model.schema.category is None:
             return "Unknown"
+        return model.data[model.schema.category].iat[row]
             
     def get_product_country(self, product_name):
         """Get country for a given product name."""
-        # Find the product name column
-        name_columns = [col for col in self.data.columns if 'name' in col.lower() or 'product' in col.lower()]
-        if not name_columns:
-            return "Unknown"
-        product_col = name_columns[0]
-        
-        try:
-            return self.data[self.data[product_col] == product_name]['Country'].iloc[0]
-        except (KeyError, IndexError):
+        model = self._model
+        row = model.row_of(product_name)
+        if row is None or model.schema.country is None:
             return "Unknown"
+        return model.data[model.schema.country].iat[row]
     
     def get_product_details(self, product_name):
         """Get details for a specific product."""
+        model = self._model
         try:
-            # Find product name column
-            product_col = [col for col in self.data.columns if 'name' in col.lower() or 'product' in col.lower()][0]
-            product = self.data[self.data[product_col] == product_name].iloc[0]
+            row = model.row_of(product_name)
+            if row is None:
+                raise IndexError(f"Product {product_name} not found")
+            product = model.data.iloc[row]
+            schema = model.schema
             
             return {
-                'category': product.get('Category', 'Unknown'),
-                'country': product.get('Country', 'Unknown'),
-                'price': product.get('Sales', 0),  # Using Sales column for price
-                'avg_rating': product.get('Rating', 0),
-                'image_url': product.get('Product Image URL', '')
+                'category': product.get(schema.category, 'Unknown'),
+                'country': product.get(schema.country, 'Unknown'),
+                'price': product.get(schema.price, 0),  # Sales column is the price by default
+                'avg_rating': product.get(schema.rating, 0),
+                'image_url': product.get(schema.image, '')
             }
         except (IndexError, KeyError) as e:
             print(f"Error getting product details: {str(e)}")
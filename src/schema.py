@@ -0,0 +1,66 @@
+"""
+Column schema for product datasets.
+
+The recommender needs to know which column holds the product name, ID,
+category, country, price, rating, image URL and (for collaborative
+filtering) the buyer's user ID. These are resolved once when the data is
+loaded instead of on every call, and can be overridden for datasets that use
+different column names.
+"""
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, Optional
+
+# Candidate column names for every role, in order of preference
+DEFAULT_COLUMNS = {
+    'product_id': ['Product ID'],
+    'category': ['Category'],
+    'country': ['Country'],
+    'price': ['Sales', 'Price'],
+    'rating': ['Rating'],
+    'image': ['Product Image URL'],
+    'user': ['User ID'],
+}
+
+
+@dataclass(frozen=True)
+class DatasetSchema:
+    """Names of the dataset columns used by the recommender (None when missing)."""
+    name: Optional[str] = None
+    product_id: Optional[str] = None
+    category: Optional[str] = None
+    country: Optional[str] = None
+    price: Optional[str] = None
+    rating: Optional[str] = None
+    image: Optional[str] = None
+    user: Optional[str] = None
+
+
+def resolve_schema(columns: Iterable[str], column_map: Optional[Dict[str, str]] = None) -> DatasetSchema:
+    """Resolve the column for every schema role.
+
+    `column_map` maps roles (e.g. 'name', 'price') to column names and takes
+    precedence over the defaults. Raises ValueError if it names an unknown role
+    or a column that is not in the dataset.
+    """
+    columns = list(columns)
+    column_map = column_map or {}
+    roles = {f.name for f in fields(DatasetSchema)}
+
+    unknown = set(column_map) - roles
+    if unknown:
+        raise ValueError(f"Unknown schema roles: {sorted(unknown)}. Valid roles: {sorted(roles)}")
+    missing = {role: col for role, col in column_map.items() if col not in columns}
+    if missing:
+        raise ValueError(f"Mapped columns not found in dataset: {missing}")
+
+    resolved = {}
+    for role in roles:
+        if role in column_map:
+            resolved[role] = column_map[role]
+        elif role == 'name':
+            # First column that looks like a product name
+            name_columns = [col for col in columns if 'name' in col.lower() or 'product' in col.lower()]
+            resolved[role] = name_columns[0] if name_columns else None
+        else:
+            resolved[role] = next((col for col in DEFAULT_COLUMNS[role] if col in columns), None)
+    return DatasetSchema(**resolved)
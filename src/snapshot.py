@@ -0,0 +1,126 @@
+"""
+Versioned binary snapshots of the prepared dataset and neighbor index.
+
+Parsing the CSV, normalizing it and building the neighbor index on every
+process start is wasteful when the source file has not changed. A snapshot
+stores the prepared DataFrames as pickles and the numeric arrays as .npy
+files, keyed by the source file's content hash, mtime and the build settings.
+Arrays are opened memory-mapped, so a cold start only maps the files.
+
+Only the latest snapshot of a source file is kept: saving one deletes the
+snapshots of earlier versions of the file and of other settings.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever the snapshot layout or the preparation pipeline changes
+SNAPSHOT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+# Snapshot directories are readable by other users, so replicas running as another user can map them
+DIRECTORY_MODE = 0o755
+
+
+def file_digest(path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_key(source_path, settings: Dict) -> str:
+    """Key identifying a snapshot of `source_path` built with `settings`."""
+    stat = os.stat(source_path)
+    parts = {
+        'version': SNAPSHOT_VERSION,
+        'sha256': file_digest(source_path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'settings': settings,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def snapshot_dir(cache_dir, source_path, key: str) -> Path:
+    return Path(cache_dir) / f"{Path(source_path).stem}-{key[:16]}"
+
+
+def remove_stale_snapshots(directory):
+    """Delete the other snapshot directories of the same source file (same stem, another key)."""
+    directory = Path(directory)
+    pattern = re.compile(re.escape(directory.name[:-16]) + '[0-9a-f]{16}')
+    for other in directory.parent.iterdir():
+        if other.name != directory.name and pattern.fullmatch(other.name) and other.is_dir():
+            # Processes that still map the old files keep them until they exit
+            shutil.rmtree(other, ignore_errors=True)
+
+
+def save_snapshot(directory, key: str, frames: Dict[str, pd.DataFrame], arrays: Dict[str, np.ndarray],
+                  meta: Optional[Dict] = None):
+    """Write a snapshot atomically: build it in a temp dir, then rename it into place."""
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=directory.name + '.tmp-', dir=directory.parent))
+    try:
+        for name, frame in frames.items():
+            frame.to_pickle(tmp / f"{name}.pkl")
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(array))
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'key': key,
+            'frames': sorted(frames),
+            'arrays': sorted(arrays),
+            'meta': meta or {},
+        }
+        with open(tmp / MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f)
+        os.chmod(tmp, DIRECTORY_MODE)  # mkdtemp creates it 0700
+        if directory.exists():
+            shutil.rmtree(directory)
+        os.replace(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        # Another process may have written the same snapshot first
+        if not (directory / MANIFEST_FILE).exists():
+            raise
+    remove_stale_snapshots(directory)
+
+
+def load_snapshot(directory, key: str, mmap_mode: Optional[str] = 'c', load_frames: bool = True
+                  ) -> Optional[Tuple[Dict[str, pd.DataFrame], Dict[str, np.ndarray], Dict]]:
+    """Load a snapshot as (frames, arrays, meta), or None if it is missing or stale.
+
+    Arrays are opened with np.load(mmap_mode=...): 'r' maps them read-only,
+    'c' copy-on-write (pages stay shared with other processes until written),
+    None reads them fully into private memory. With load_frames=False only
+    the arrays are opened and frames is empty.
+    """
+    directory = Path(directory)
+    try:
+        with open(directory / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != SNAPSHOT_VERSION or manifest.get('key') != key:
+        return None
+
+    try:
+        frame_names = manifest['frames'] if load_frames else []
+        frames = {name: pd.read_pickle(directory / f"{name}.pkl") for name in frame_names}
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in manifest['arrays']}
+    except (OSError, ValueError, EOFError) as e:
+        print(f"Ignoring unreadable snapshot at {directory}: {e}")
+        return None
+    return frames, arrays, manifest['meta']
@@ -0,0 +1,227 @@
+"""
+Generate large synthetic datasets with the same columns as ecommerce_dataset_updated.csv.
+
+The shipped CSVs only hold a few hundred order lines, which is not enough to
+answer scaling questions. The generator produces any number of order lines
+with realistic skew:
+- product and user popularity follow a Zipf distribution
+- unit prices are log-normal per category (medians taken from the real data)
+- ratings cluster around a per-product base rating
+- country, latitude/longitude, region and market stay consistent
+
+Rows are written to disk in chunks, so tens of millions of rows can be
+generated in bounded memory.
+
+Usage:
+    python -m src.synthetic_data output.csv --rows 10000000 [--products 50000] [--users 200000]
+"""
+import argparse
+import datetime
+import time
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# Columns of ecommerce_dataset_updated.csv, in file order
+DATASET_COLUMNS = ['Row ID', 'Order ID', 'Order Date', 'User ID', 'Segment', 'City', 'State', 'Country',
+                   'Country latitude', 'Country longitude', 'Region', 'Market', 'Subcategory', 'Category',
+                   'Product', 'Quantity', 'Sales', 'Discount', 'Profit', 'Product ID', 'Rating',
+                   'Product Image URL']
+
+# Category -> (subcategories, median unit price, log-normal sigma, share of products)
+CATEGORIES = {
+    'Body care': (['bath oils, bubbles and soaks', 'body lotions', 'hand creams'], 17.0, 0.7, 0.35),
+    'Face care': (['face moisturizing products', 'cleansers', 'serums'], 18.0, 0.6, 0.2),
+    'Hair care': (['shampoos and conditioners', 'hair colors and toners', 'styling products'], 13.0, 0.6, 0.2),
+    'Home and Accessories': (['candles, sprays, diffusers', 'brushes and applicators', 'fragrances',
+                              'Accessories'], 24.0, 0.8, 0.15),
+    'Luxury Jewelry': (['rings', 'necklaces', 'bracelets'], 600.0, 0.5, 0.03),
+    'Make up': (['lipsticks', 'foundations', 'eye makeup'], 60.0, 0.4, 0.07),
+}
+
+# (Country, latitude, longitude, region, market)
+COUNTRIES = [
+    ('United States', 37.09024, -95.712891, 'Eastern US', 'USCA'),
+    ('Mexico', 23.634501, -102.552784, 'Central America', 'LATAM'),
+    ('Brazil', -14.235004, -51.92528, 'South America', 'LATAM'),
+    ('Cuba', 21.521757, -77.781167, 'Caribbean', 'LATAM'),
+    ('United Kingdom', 55.378051, -3.435973, 'Northern Europe', 'Europe'),
+    ('France', 46.227638, 2.213749, 'Western Europe', 'Europe'),
+    ('Germany', 51.165691, 10.451526, 'Western Europe', 'Europe'),
+    ('Spain', 40.463667, -3.74922, 'Southern Europe', 'Europe'),
+    ('Russia', 61.52401, 105.318756, 'Eastern Europe', 'Europe'),
+    ('China', 35.86166, 104.195397, 'Eastern Asia', 'Asia Pacific'),
+    ('India', 20.593684, 78.96288, 'Southern Asia', 'Asia Pacific'),
+    ('Indonesia', -0.789275, 113.921327, 'Southeastern Asia', 'Asia Pacific'),
+    ('Australia', -25.274398, 133.775136, 'Oceania', 'Asia Pacific'),
+    ('Turkey', 38.963745, 35.243322, 'Western Asia', 'Asia Pacific'),
+    ('Morocco', 31.791702, -7.09262, 'North Africa', 'Africa'),
+    ('Nigeria', 9.081999, 8.675277, 'Western Africa', 'Africa'),
+]
+
+SEGMENTS = (['Consumer', 'Corporate', 'Self-Employed'], [0.5, 0.32, 0.18])
+DISCOUNTS = ([0.0, 0.1, 0.2, 0.4, 0.47, 0.5, 0.6, 0.7], [0.64, 0.05, 0.07, 0.05, 0.07, 0.03, 0.05, 0.04])
+BRANDS = ['Lumiere', 'Verdant', 'Aurelia', 'Nordic Bloom', 'Maison Clair', 'Solstice', 'Botanica', 'Ivory Coast',
+          'Velvet Rose', 'Atelier Nine']
+CITIES_PER_COUNTRY = 20
+DEFAULT_CHUNK_SIZE = 200_000
+
+
+def zipf_cdf(n: int, exponent: float) -> np.ndarray:
+    """Cumulative probabilities of ranks 1..n under a Zipf law with the given exponent."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def sample_zipf(rng: np.random.Generator, cdf: np.ndarray, size: int) -> np.ndarray:
+    """Sample 0-based ranks from a precomputed Zipf CDF."""
+    return np.minimum(np.searchsorted(cdf, rng.random(size)), len(cdf) - 1)
+
+
+def generate_products(n_products: int, seed: int = 0) -> pd.DataFrame:
+    """Product table: ID, name, category, subcategory, unit price, base rating and image URL."""
+    rng = np.random.default_rng(seed)
+    names = list(CATEGORIES)
+    shares = np.array([CATEGORIES[name][3] for name in names])
+    category_idx = rng.choice(len(names), n_products, p=shares / shares.sum())
+
+    categories = np.array(names, dtype=object)[category_idx]
+    subcategories = np.empty(n_products, dtype=object)
+    unit_prices = np.empty(n_products)
+    for i, name in enumerate(names):
+        subs, median, sigma, _ = CATEGORIES[name]
+        mask = category_idx == i
+        count = int(mask.sum())
+        subcategories[mask] = np.array(subs, dtype=object)[rng.integers(0, len(subs), count)]
+        unit_prices[mask] = np.round(rng.lognormal(np.log(median), sigma, count), 2)
+
+    width = len(str(n_products))
+    product_ids = np.array([f"P{i:0{width}d}" for i in range(n_products)], dtype=object)
+    brands = np.array(BRANDS, dtype=object)[rng.integers(0, len(BRANDS), n_products)]
+    return pd.DataFrame({
+        'Product ID': product_ids,
+        'Product': brands + ' ' + subcategories + ' ' + product_ids,
+        'Category': categories,
+        'Subcategory': subcategories,
+        'Unit Price': np.maximum(unit_prices, 1.0),
+        # Real ratings skew low, with a few highly rated products
+        'Base Rating': rng.choice([1.5, 2.0, 3.0, 4.5], n_products, p=[0.45, 0.3, 0.1, 0.15]),
+        'Product Image URL': 'https://example.com/images/' + product_ids + '.jpg',
+    })
+
+
+def generate_orders(n_rows: int, n_products: int = 10_000, n_users: Optional[int] = None, seed: int = 0,
+                    product_exponent: float = 1.1, user_exponent: float = 0.8,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield order lines with DATASET_COLUMNS in chunks of at most chunk_size rows.
+
+    Products and users are drawn with Zipf popularity; the most popular
+    product is not always the first ID. Orders have two lines on average.
+    """
+    if n_users is None:
+        n_users = max(n_products * 4, 1)
+    rng = np.random.default_rng(seed)
+    products = generate_products(n_products, seed=seed)
+    # Popularity rank -> product row, so popular products are spread over the ID range
+    product_by_rank = rng.permutation(n_products)
+    product_cdf = zipf_cdf(n_products, product_exponent)
+    user_cdf = zipf_cdf(n_users, user_exponent)
+    user_segments = rng.choice(SEGMENTS[0], n_users, p=SEGMENTS[1])
+    user_countries = rng.integers(0, len(COUNTRIES), n_users)
+
+    country_table = pd.DataFrame(COUNTRIES, columns=['Country', 'Country latitude', 'Country longitude',
+                                                     'Region', 'Market'])
+    # Order dates in 2023, formatted like the real data (M/D/YYYY)
+    days_of_year = [datetime.date(2023, 1, 1) + datetime.timedelta(days=d) for d in range(365)]
+    dates = np.array([f"{day.month}/{day.day}/{day.year}" for day in days_of_year], dtype=object)
+
+    row_offset = 0
+    order_offset = 0
+    while row_offset < n_rows:
+        size = min(chunk_size, n_rows - row_offset)
+        # A new order starts with probability 0.5 per line (mean two lines per order)
+        new_order = rng.random(size) < 0.5
+        new_order[0] = True
+        order_numbers = order_offset + np.cumsum(new_order)
+        order_offset = int(order_numbers[-1])
+
+        # Every line of an order shares its user and date
+        order_starts = np.flatnonzero(new_order)
+        lines_per_order = np.diff(np.append(order_starts, size))
+        users = np.repeat(sample_zipf(rng, user_cdf, len(order_starts)), lines_per_order)
+        days = np.repeat(rng.integers(0, len(dates), len(order_starts)), lines_per_order)
+
+        rows = product_by_rank[sample_zipf(rng, product_cdf, size)]
+        quantity = rng.integers(1, 10, size)
+        discount = rng.choice(DISCOUNTS[0], size, p=DISCOUNTS[1])
+        unit_price = products['Unit Price'].to_numpy()[rows]
+        sales = np.round(unit_price * quantity * (1 - discount), 2)
+        margin = rng.uniform(-0.2, 0.45, size)
+        rating = np.clip(np.rint(products['Base Rating'].to_numpy()[rows] + rng.normal(0, 0.7, size)), 1, 5)
+
+        countries = country_table.iloc[user_countries[users]].reset_index(drop=True)
+        city_numbers = users % CITIES_PER_COUNTRY
+        user_ids = pd.Series(users).map('U-{:07d}'.format).to_numpy()
+        chunk = pd.DataFrame({
+            'Row ID': np.arange(row_offset + 1, row_offset + size + 1),
+            'Order ID': pd.Series(order_numbers).map('ORD-{:09d}'.format).to_numpy(),
+            'Order Date': dates[days],
+            'User ID': user_ids,
+            'Segment': user_segments[users],
+            'City': countries['Country'] + ' City ' + pd.Series(city_numbers).astype(str),
+            'State': countries['Country'] + ' State ' + pd.Series(city_numbers % 5).astype(str),
+            'Country': countries['Country'],
+            'Country latitude': countries['Country latitude'],
+            'Country longitude': countries['Country longitude'],
+            'Region': countries['Region'],
+            'Market': countries['Market'],
+            'Subcategory': products['Subcategory'].to_numpy()[rows],
+            'Category': products['Category'].to_numpy()[rows],
+            'Product': products['Product'].to_numpy()[rows],
+            'Quantity': quantity,
+            'Sales': sales,
+            'Discount': discount,
+            'Profit': np.round(sales * margin, 2),
+            'Product ID': products['Product ID'].to_numpy()[rows],
+            'Rating': rating,
+            'Product Image URL': products['Product Image URL'].to_numpy()[rows],
+        })
+        yield chunk[DATASET_COLUMNS]
+        row_offset += size
+
+
+def generate_dataset(n_rows: int, n_products: int = 10_000, **kwargs) -> pd.DataFrame:
+    """Generate a whole dataset in memory (for sizes that comfortably fit)."""
+    return pd.concat(generate_orders(n_rows, n_products, **kwargs), ignore_index=True)
+
+
+def write_dataset(path, n_rows: int, n_products: int = 10_000, **kwargs) -> int:
+    """Stream a generated dataset to a CSV file chunk by chunk. Returns the rows written."""
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for chunk in generate_orders(n_rows, n_products, **kwargs):
+            chunk.to_csv(f, index=False, header=written == 0)
+            written += len(chunk)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help="CSV file to write")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--products', type=int, default=10_000)
+    parser.add_argument('--users', type=int, default=None, help="Default: 4 x products")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = write_dataset(args.output, args.rows, args.products, n_users=args.users, seed=args.seed,
+                            chunk_size=args.chunk_size)
+    print(f"Wrote {written} rows to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
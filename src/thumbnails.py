@@ -0,0 +1,298 @@
+"""
+Local thumbnail cache for product images.
+
+Product image URLs point at full-size remote images (e.g. 1080px product
+shots), which every browser session downloads again and scales down to a
+130px card. The cache downloads each image once, resizes it to every size
+the dashboard displays, and stores the thumbnails on disk under the SHA-256
+of their content, so identical images (shared placeholders, the same shot
+under several URLs) are stored once. Thumbnails are served from Streamlit's
+static folder (src/static, with server.enableStaticServing) or handed to
+st.image as local files.
+
+The cache is bounded: once it holds more than `max_bytes`, the least
+recently used thumbnails are evicted. The index (URL and size -> file, in
+LRU order) is a JSON file next to the thumbnails, rewritten atomically
+after every download and on close().
+
+Resizing needs Pillow; without it the original image is cached as is.
+Downloads go through an injectable `fetcher(url) -> bytes`, so the cache can
+be exercised offline. Failed downloads are not retried for `retry_after`
+seconds, so an offline dashboard does not wait on every rerun.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional (installed with streamlit)
+    Image = None
+
+# Image widths used by the dashboard
+SIZES = (120, 130, 140, 200)
+DEFAULT_DIRECTORY = Path(__file__).parent / "static" / "thumbnails"
+# Where Streamlit serves src/static/thumbnails when static serving is enabled
+DEFAULT_BASE_URL = "app/static/thumbnails"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_TIMEOUT = 10.0
+RETRY_AFTER = 300.0
+MAX_WORKERS = 8
+INDEX_FILE = "index.json"
+USER_AGENT = "Mozilla/5.0 (smart-store thumbnail cache)"
+
+# Leading bytes -> file extension, for images stored without Pillow
+IMAGE_SIGNATURES = {
+    b'\xff\xd8\xff': 'jpg',
+    b'\x89PNG': 'png',
+    b'GIF8': 'gif',
+    b'<svg': 'svg',
+    b'<?xml': 'svg',
+}
+
+
+def fetch_url(url: str, timeout: float = DEFAULT_TIMEOUT) -> bytes:
+    """Download a URL (the default fetcher)."""
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+def image_extension(data: bytes) -> str:
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    return next((ext for signature, ext in IMAGE_SIGNATURES.items() if data.startswith(signature)), 'img')
+
+
+def make_thumbnails(data: bytes, sizes: Iterable[int]) -> Dict[int, Tuple[bytes, str]]:
+    """Image bytes scaled to fit size x size, and their extension, for every size.
+
+    The image is decoded once (JPEGs at a reduced scale close to the largest
+    size). Returns the original bytes for every size when Pillow is not
+    installed. Raises ValueError if Pillow cannot decode the image.
+    """
+    sizes = sorted(set(sizes), reverse=True)
+    if Image is None:
+        return {size: (data, image_extension(data)) for size in sizes}
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft('RGB', (sizes[0], sizes[0]))
+            image.load()
+            thumbnails = {}
+            for size in sizes:
+                image.thumbnail((size, size))
+                out = io.BytesIO()
+                if image.mode in ('RGBA', 'LA', 'P'):
+                    image.save(out, format='PNG', optimize=True)
+                    thumbnails[size] = out.getvalue(), 'png'
+                else:
+                    image.convert('RGB').save(out, format='JPEG', quality=85, optimize=True)
+                    thumbnails[size] = out.getvalue(), 'jpg'
+            return thumbnails
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"cannot decode image: {e}") from e
+
+
+class ThumbnailCache:
+    """Content-addressed on-disk cache of resized product images with LRU eviction.
+
+    Safe to share between threads (the dashboard shares one cache between
+    all sessions). A URL is downloaded once even when several threads ask
+    for it at the same time.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes: int = DEFAULT_MAX_BYTES,
+                 fetcher: Optional[Callable[[str], bytes]] = None, sizes: Iterable[int] = SIZES,
+                 base_url: str = DEFAULT_BASE_URL, retry_after: float = RETRY_AFTER,
+                 max_workers: int = MAX_WORKERS):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.fetcher = fetcher or fetch_url
+        self.sizes = tuple(sorted(set(sizes)))
+        self.base_url = base_url.rstrip('/')
+        self.retry_after = retry_after
+        self.max_workers = max_workers
+        self.stats = {'hits': 0, 'misses': 0, 'downloads': 0, 'failures': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()  # "size url" -> (file, bytes), LRU first
+        self._file_refs: Dict[str, int] = {}    # file -> number of entries using it
+        self._total_bytes = 0
+        self._failed: Dict[str, float] = {}     # URL -> monotonic time of the failed download
+        self._inflight: Dict[str, threading.Event] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        if Image is None:
+            print("Warning: Pillow is not installed; product images are cached at full size")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes of thumbnails on disk."""
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def path(self, url: str, size: int) -> Optional[Path]:
+        """Local file of the thumbnail of `url` at `size`, downloading it if needed.
+
+        Returns None if the image cannot be downloaded or decoded.
+        """
+        name = self._lookup(url, size)
+        if name is None and self._fetch(url):
+            name = self._lookup(url, size, count=False)
+        return None if name is None else self._file_path(name)
+
+    def url(self, url: str, size: int) -> str:
+        """URL the browser should load: the cached thumbnail, or `url` itself if it cannot be cached."""
+        return self.urls([url], size)[0]
+
+    def urls(self, urls: Iterable[str], size: int) -> List[str]:
+        """Thumbnail URLs for a list of images; missing ones are downloaded in parallel."""
+        urls = list(urls)
+        names = [self._lookup(url, size) if isinstance(url, str) and url else None for url in urls]
+        missing = {url for url, name in zip(urls, names) if name is None and isinstance(url, str) and url}
+        if missing:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='thumbnails')
+                pool = self._pool
+            list(pool.map(self._fetch, missing))
+            names = [name or (self._lookup(url, size, count=False) if url in missing else None)
+                     for url, name in zip(urls, names)]
+        return [f"{self.base_url}/{name[:2]}/{name}" if name else url for url, name in zip(urls, names)]
+
+    def close(self):
+        """Stop the download threads and save the LRU order of the latest hits."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        with self._lock:
+            self._save_index()
+
+    def _lookup(self, url: str, size: int, count: bool = True) -> Optional[str]:
+        size = self._size_for(size)
+        with self._lock:
+            entry = self._entries.get(f"{size} {url}")
+            if entry is not None:
+                self._entries.move_to_end(f"{size} {url}")
+            if count:
+                self.stats['hits' if entry is not None else 'misses'] += 1
+        return None if entry is None else entry[0]
+
+    def _size_for(self, size: int) -> int:
+        """The smallest cached size at least `size` wide (the largest if none is)."""
+        return next((s for s in self.sizes if s >= size), self.sizes[-1])
+
+    def _fetch(self, url: str) -> bool:
+        """Download `url` once and store its thumbnails. Returns False if that failed."""
+        with self._lock:
+            failed_at = self._failed.get(url)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+                return False
+            event = self._inflight.get(url)
+            owner = event is None
+            if owner:
+                event = self._inflight[url] = threading.Event()
+        if not owner:  # Another thread is downloading it
+            event.wait()
+            with self._lock:
+                return url not in self._failed
+
+        try:
+            thumbnails = make_thumbnails(self.fetcher(url), self.sizes)
+            # Files are written under the lock so eviction cannot delete a shared file in between
+            with self._lock:
+                for size, (thumbnail, ext) in thumbnails.items():
+                    self._add_entry(f"{size} {url}", *self._write_file(thumbnail, ext))
+                self._failed.pop(url, None)
+                self.stats['downloads'] += 1
+                self._evict()
+                self._save_index()
+            return True
+        except Exception as e:  # Network and HTTP errors, undecodable images, a full disk
+            print(f"Warning: could not cache image {url}: {e}")
+            with self._lock:
+                self._failed[url] = time.monotonic()
+                self.stats['failures'] += 1
+            return False
+        finally:
+            with self._lock:
+                del self._inflight[url]
+            event.set()
+
+    def _file_path(self, name: str) -> Path:
+        return self.directory / name[:2] / name
+
+    def _write_file(self, data: bytes, ext: str) -> Tuple[str, int]:
+        """Store bytes under their SHA-256 (once) and return (file name, size)."""
+        name = f"{hashlib.sha256(data).hexdigest()}.{ext}"
+        path = self._file_path(name)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=name + '.tmp-', dir=path.parent)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return name, len(data)
+
+    def _add_entry(self, key: str, name: str, n_bytes: int):
+        if key in self._entries:
+            self._remove_entry(key)
+        self._entries[key] = (name, n_bytes)
+        refs = self._file_refs.get(name, 0)
+        if not refs:
+            self._total_bytes += n_bytes
+        self._file_refs[name] = refs + 1
+
+    def _remove_entry(self, key: str):
+        name, n_bytes = self._entries.pop(key)
+        self._file_refs[name] -= 1
+        if not self._file_refs[name]:
+            del self._file_refs[name]
+            self._total_bytes -= n_bytes
+            try:
+                self._file_path(name).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._remove_entry(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+
+    def _load_index(self):
+        index_path = self.directory / INDEX_FILE
+        try:
+            with open(index_path) as f:
+                entries = json.load(f)['entries']
+        except FileNotFoundError:
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Warning: ignoring unreadable thumbnail index {index_path}: {e}")
+            return
+        for key, name, n_bytes in entries:
+            if self._file_path(name).exists():
+                self._add_entry(key, name, n_bytes)
+        self._evict()
+
+    def _save_index(self):
+        """Write the index in LRU order (atomically: temp file, then rename)."""
+        entries = [[key, name, n_bytes] for key, (name, n_bytes) in self._entries.items()]
+        fd, tmp = tempfile.mkstemp(prefix=INDEX_FILE + '.tmp-', dir=self.directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'entries': entries}, f)
+        os.replace(tmp, self.directory / INDEX_FILE)